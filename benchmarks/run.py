@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+"""
+Packeteer benchmarks
+Times the common packet operations over representative packet shapes, saves
+the results as JSON and compares them against a baseline to flag regressions
+
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --baseline benchmarks/baseline.json
+"""
+from __future__ import unicode_literals, print_function
+import os
+import sys
+import json
+import timeit
+import argparse
+import platform
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from packeteer import packets, fields #pylint: disable=wrong-import-position
+
+# Packet shapes
+class SmallFixed(packets.BigEndian):
+    """ Small fixed header """
+    fields = [
+        fields.UInt8('type'),
+        fields.UInt8('flags'),
+        fields.UInt16('length'),
+        fields.UInt32('sequence'),
+    ]
+
+class Wide(packets.LittleEndian):
+    """ Wide packet of 64 fields """
+    fields = [(fields.UInt32, fields.Int16, fields.Double, fields.Bool)[idx % 4]('f{}'.format(idx))
+              for idx in range(64)]
+
+class Inner(packets.BigEndian):
+    """ Inner dynamic packet """
+    fields = [
+        fields.UInt8('size'),
+        fields.Raw('raw', size='size'),
+    ]
+
+class Nested(packets.BigEndian):
+    """ Nested packets """
+    fields = [
+        fields.Packet('header', default=SmallFixed()),
+        fields.Packet('first', default=Inner()),
+        fields.Packet('second', default=Inner()),
+    ]
+
+class LongList(packets.LittleEndian):
+    """ Long list payload """
+    fields = [
+        fields.UInt16('count'),
+        fields.List('values', fields.UInt32(), size='count'),
+    ]
+
+class LongString(packets.BigEndian):
+    """ Long string payload """
+    fields = [
+        fields.UInt16('size'),
+        fields.String('text', size='size'),
+    ]
+
+SHAPES = {
+    'small_fixed': (SmallFixed, lambda: {'type': 1, 'flags': 2, 'length': 8, 'sequence': 42}),
+    'wide': (Wide, lambda: {'f{}'.format(idx): idx % 2 for idx in range(64)}),
+    'nested': (Nested, lambda: {'first': Inner(raw=b'a' * 16), 'second': Inner(raw=b'b' * 64)}),
+    'long_list': (LongList, lambda: {'values': list(range(1000))}),
+    'long_string': (LongString, lambda: {'text': 'x' * 4096}),
+}
+
+def operations(packet_cls, kwargs):
+    """ Fetch the operations to time for a packet shape """
+    packet = packet_cls(**kwargs)
+    other = packet_cls(**kwargs)
+    raw = packet.pack()
+    target = packet_cls()
+    return {
+        'construct': lambda: packet_cls(**kwargs),
+        'pack': packet.pack,
+        'unpack': lambda: target.unpack(raw),
+        'from_raw': lambda: packet_cls.from_raw(raw),
+        'size': packet.size,
+        'hex_dump': packet.hex_dump,
+        'equality': lambda: packet == other,
+    }
+
+def measure(func, repeat):
+    """ Time a function, returning the best number of seconds per call """
+    timer = timeit.Timer(func)
+    # Python 2 can't pick the number of calls taking at least 0.2 seconds
+    number = timer.autorange()[0] if hasattr(timer, 'autorange') else 1000
+    return min(timer.repeat(repeat, number)) / number
+
+def run(selected=None, repeat=5):
+    """ Run the benchmarks whose names contain the selected text """
+    results = {}
+    for shape, (packet_cls, kwargs) in sorted(SHAPES.items()):
+        for operation, func in sorted(operations(packet_cls, kwargs()).items()):
+            name = '{}.{}'.format(shape, operation)
+            if selected and selected not in name:
+                continue
+            results[name] = measure(func, repeat)
+            print('{:<28} {:>12.3f} us'.format(name, results[name] * 1e6))
+    return results
+
+def compare(results, baseline, threshold):
+    """ Compare results with a baseline, returning the names of the regressions """
+    regressions = []
+    print('\n{:<28} {:>12} {:>12} {:>8}'.format('benchmark', 'baseline us', 'current us', 'ratio'))
+    for name in sorted(results):
+        if name not in baseline:
+            continue
+        ratio = results[name] / baseline[name]
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = 'REGRESSION'
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            flag = 'improved'
+        print('{:<28} {:>12.3f} {:>12.3f} {:>8.2f} {}'.format(
+            name, baseline[name] * 1e6, results[name] * 1e6, ratio, flag))
+    return regressions
+
+def main():
+    """ Run the benchmarks from the command line """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--output', help='Save the results to this JSON file')
+    parser.add_argument('--baseline', help='Compare the results to this JSON file')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Slowdown ratio flagged as a regression (default: 0.1)')
+    parser.add_argument('--filter', help='Only run benchmarks whose names contain this text')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing repeats (default: 5)')
+    args = parser.parse_args()
+
+    results = run(args.filter, args.repeat)
+    if args.output:
+        with open(args.output, 'w') as fileobj:
+            json.dump({
+                'python': platform.python_version(),
+                'implementation': platform.python_implementation(),
+                'results': results,
+            }, fileobj, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as fileobj:
+            baseline = json.load(fileobj)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print('\n{} regression(s) over {:.0%}'.format(len(regressions), args.threshold))
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,2 @@
+""" Packeteer: The packet serializer """
+from packeteer.packets import hex_dump, stats, enable_stats, disable_stats, reset_stats
@@ -0,0 +1,51 @@
+""" Asyncio helpers - Read and write packets over asyncio streams (Python 3.5+) """
+import asyncio
+from packeteer.stream import Framer
+
+async def read_packet(reader, packet_cls):
+    """
+    Read a single packet from a StreamReader. Only the bytes of the packet are
+    read; The least number of bytes it can take first, then the rest of it once
+    its size fields are known
+    """
+    raw = bytearray()
+    while True:
+        size, exact = packet_cls.measure(raw)
+        if size > len(raw):
+            raw += await reader.readexactly(size - len(raw))
+        if exact:
+            return packet_cls.from_raw(bytes(raw))
+
+async def write_packets(writer, packets):
+    """ Write packets to a StreamWriter with a single write of their joined bytes """
+    writer.write(b''.join(packet.pack() for packet in packets))
+    await writer.drain()
+
+class PacketProtocol(asyncio.Protocol):
+    """
+    Packet protocol
+    Reassembles the packets of a single class from the data received, and
+    hands each of them to packet_received(), which subclasses override
+    """
+    packet_cls = None
+
+    def __init__(self, packet_cls=None):
+        super(PacketProtocol, self).__init__()
+        if packet_cls is not None:
+            self.packet_cls = packet_cls
+        self.transport = None
+        self._framer = Framer(self.packet_cls)
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        for packet in self._framer.feed(data):
+            self.packet_received(packet)
+
+    def packet_received(self, packet): #pylint: disable=no-self-use, unused-argument
+        """ Called with every packet received, does nothing unless overridden """
+
+    def send_packets(self, *packets):
+        """ Send packets with a single write of their joined bytes """
+        self.transport.write(b''.join(packet.pack() for packet in packets))
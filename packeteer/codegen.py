@@ -0,0 +1,138 @@
+""" Code generation - Straight-line pack and unpack functions for packet classes """
+from __future__ import unicode_literals
+import struct
+import six
+from packeteer import fields
+from packeteer.fields import _overrides
+
+def _position(base, delta):
+    """ Fetch the expression of a position relative to a base variable """
+    if delta == 0:
+        return base
+    return '{} + {}'.format(base, delta)
+
+def _bytes(raw):
+    """ Convert a slice of any buffer into bytes, as memoryviews don't convert on Python 2 """
+    return raw.tobytes() if isinstance(raw, memoryview) else bytes(raw)
+
+def _inline_sized(field):
+    """ Check if a field is raw data or a string sized by another field """
+    return type(field) in (fields.Raw, fields.String) and field.reference() is not None
+
+def generate(cls):
+    """
+    Generate the source of the pack and unpack functions of a packet class,
+    along with the namespace they're executed in. Consecutive fixed size
+    fields are packed and unpacked with a single struct, raw data and strings
+    sized by other fields are written and sliced directly in the buffer, and
+    any other field is left to its own methods
+    """
+    endian = '>' if cls.big_endian else '<'
+    namespace = {'error': struct.error, 'pack_bytes': struct.pack_into, 'big_endian': cls.big_endian}
+    if six.PY2:
+        namespace['bytes'] = _bytes
+    pack = ['def pack_into(self, values, buffer, offset):', '    p0 = offset']
+    unpack = ['def unpack_from(self, values, buffer, offset, retain):', '    p0 = offset']
+    positions = []
+    base, delta = 'p0', 0
+
+    idx = 0
+    while idx < len(cls.fields):
+        field = cls.fields[idx]
+        # Runs of fixed size fields are compiled into a single struct
+        if field.fmt() is not None:
+            start = idx
+            fmt = endian
+            targets, decoded, args = [], [], []
+            while idx < len(cls.fields) and cls.fields[idx].fmt() is not None:
+                field = cls.fields[idx]
+                positions.append(_position(base, delta + struct.calcsize(fmt)))
+                fmt += field.fmt()
+                if field.fmt() != 'x':
+                    value = 'values[{}]'.format(idx)
+                    if _overrides(field, '_encode'):
+                        namespace['e{}'.format(idx)] = field._encode #pylint: disable=protected-access
+                        args.append('e{}({})'.format(idx, value))
+                    else:
+                        args.append(value)
+                    if isinstance(field, fields.Padding):
+                        targets.append('_')
+                    else:
+                        targets.append(value)
+                        if _overrides(field, '_decode'):
+                            namespace['d{}'.format(idx)] = field._decode #pylint: disable=protected-access
+                            decoded.append('    {0} = d{1}({0})'.format(value, idx))
+                idx += 1
+
+            name = 's{}'.format(start)
+            namespace[name] = struct.Struct(fmt)
+            at = _position(base, delta)
+            pack.append('    {}.pack_into(buffer, {})'.format(name, ', '.join([at] + args)))
+            if targets:
+                unpack.append('    {}{} = {}.unpack_from(buffer, {})'.format(
+                    ', '.join(targets), ',' if len(targets) == 1 else '', name, at))
+                unpack.extend(decoded)
+            delta += namespace[name].size
+            continue
+
+        # Dynamic fields start at a position only known at runtime
+        var = 'p{}'.format(idx)
+        at = _position(base, delta)
+        if at != var:
+            pack.append('    {} = {}'.format(var, at))
+            unpack.append('    {} = {}'.format(var, at))
+        positions.append(var)
+        namespace['f{}'.format(idx)] = field
+
+        if _inline_sized(field):
+            ref = cls._fnames[field.reference()] #pylint: disable=protected-access
+            value = 'values[{}]'.format(idx)
+            if isinstance(field, fields.String):
+                namespace['e{}'.format(idx)] = field._encode #pylint: disable=protected-access
+                value = 'e{}({})'.format(idx, value)
+            pack.extend([
+                '    n = int(values[{}])'.format(ref),
+                "    pack_bytes(str(n) + 's', buffer, {}, {})".format(var, value),
+            ])
+            unpack.extend([
+                '    n = int(values[{}])'.format(ref),
+                '    raw = buffer[{0}:{0} + n]'.format(var),
+                '    if len(raw) != n:',
+                "        raise error('unpack_from requires a buffer of at least {{}} bytes'.format({} + n))".format(var),
+            ])
+            if isinstance(field, fields.String):
+                namespace['d{}'.format(idx)] = field._decode #pylint: disable=protected-access
+                unpack.append('    values[{0}] = d{0}(bytes(raw))'.format(idx))
+            else:
+                unpack.append('    values[{}] = bytes(raw)'.format(idx))
+        else:
+            pack.append('    n = f{0}.pack_into(values[{0}], buffer, {1}, self, big_endian)'.format(idx, var))
+            # Sub-packets retain their bytes along with the packet
+            extra = ', retain' if isinstance(field, fields.Packet) else ''
+            unpack.append('    values[{0}], n = f{0}.unpack_from(buffer, {1}, self, big_endian{2})'.format(
+                idx, var, extra))
+
+        idx += 1
+        base, delta = 'p{}'.format(idx), 0
+        pack.append('    {} = {} + n'.format(base, var))
+        unpack.append('    {} = {} + n'.format(base, var))
+
+    end = _position(base, delta)
+    pack.append('    return {} - offset'.format(end))
+    unpack.append('    return [{}]'.format(', '.join(positions + [end])))
+    return '\n'.join(pack + [''] + unpack) + '\n', namespace
+
+def source(cls):
+    """ Fetch the generated source of the pack and unpack functions of a packet class """
+    return generate(cls)[0]
+
+def compile_packet(cls):
+    """
+    Compile the pack and unpack functions of a packet class. Both are given
+    the packet, its values, the buffer and the offset, and unpacking whether
+    sub-packets retain their bytes. Packing returns the number of bytes
+    written, unpacking the offsets of every field and the end
+    """
+    code, namespace = generate(cls)
+    exec(compile(code, '<packeteer {}>'.format(cls.__name__), 'exec'), namespace) #pylint: disable=exec-used
+    return namespace['pack_into'], namespace['unpack_from']
@@ -1,16 +1,86 @@
 """ Field classes - Classes used to define a packets components """
 #pylint: disable=C0326
 from __future__ import unicode_literals
+import sys
+import array
 import struct
 import copy
 from builtins import bytes #pylint: disable=redefined-builtin
 import six
 
+# Array type codes able to hold the values of each numeric struct format
+ARRAY_TYPES = {
+    'b': 'b', 'h': 'h', 'i': 'il', 'q': 'ql',
+    'B': 'B', 'H': 'H', 'I': 'IL', 'Q': 'QL',
+    'f': 'f', 'd': 'd',
+}
+
+def _typecode(field):
+    """ Find the array type code with the same item size as a fields format """
+    fmt = field.fmt()
+    for typecode in ARRAY_TYPES.get(fmt, ''):
+        try:
+            if array.array(typecode).itemsize == struct.calcsize(fmt):
+                return typecode
+        except ValueError:
+            continue
+    raise ValueError("{} fields can't be stored in an array".format(type(field).__name__))
+
+def _limits(fmt):
+    """
+    Compute the types and range of values a numeric struct format accepts, so
+    they can be validated without packing them
+    """
+    if not fmt or fmt not in 'bBhHiIqQfd':
+        return None
+    if fmt == 'f':
+        largest = struct.unpack('<f', b'\xff\xff\x7f\x7f')[0]
+        return (float,) + six.integer_types, -largest, largest
+    if fmt == 'd':
+        return (float,) + six.integer_types, -sys.float_info.max, sys.float_info.max
+    bits = struct.calcsize(fmt) * 8
+    if fmt.islower():
+        return six.integer_types, -2 ** (bits - 1), 2 ** (bits - 1) - 1
+    return six.integer_types, 0, 2 ** bits - 1
+
+def _overrides(field, method):
+    """ Check if a field class overrides the given base field method """
+    return getattr(type(field), method) != getattr(Field, method)
+
+def _find(buffer, sub, start=0):
+    """ Find a byte string in any buffer from the given offset, returning -1 if it's missing """
+    if not isinstance(buffer, memoryview):
+        return buffer.find(sub, start)
+
+    # Views can't be searched, so growing windows of them are copied instead of
+    #  the whole rest of the buffer, overlapping by all but a byte of the string
+    end = len(buffer)
+    window = 64
+    while start < end:
+        stop = min(start + window, end)
+        found = buffer[start:stop].tobytes().find(sub)
+        if found >= 0:
+            return start + found
+        if stop == end:
+            break
+        start = max(stop - len(sub) + 1, start + 1)
+        window *= 2
+    return -1
+
 class Field(object):
     """
     Field Base class
     Do not derive from this class, but use the pre-existing type classes instead
+
+    Fields are shared by every instance of the packet class that declares them,
+    and only describe how a value is validated and serialized. The values
+    themselves are stored by the packet instances.
     """
+    # Default values of mutable fields must be copied for every packet instance
+    mutable = False
+    # Sizes of volatile fields can change without their value being set again
+    volatile = False
+
     def __init__(self, name=None, _type=None, default=None):
         if _type is not None:
             assert _type in 'xcbB?hHiIqQfds'
@@ -19,90 +89,209 @@ class Field(object):
         self.name     = name
         self.type     = _type
         self._default = default
-        self._parent  = None
-        self._value   = None
-        self.reset()
-
-    @property
-    def value(self):
-        """ Read only value to force set and rest commands """
-        return self._value
-
-    def _register(self, parent):
-        """ Register the parent packet as owning this field """
-        self._parent = parent
-
-    def reset(self):
-        """ Reset the internal value to the default """
-        self.set(self._default)
-
-    def set(self, value):
-        """ Set the internal value """
-        # Set value, rollback if invalid
-        old_value = self._value
-        self._value = value
-        try:
-            self.pack()
-        except struct.error:
-            self._value = old_value
-            raise
+        self._static  = struct.calcsize(_type) if _type is not None else None
+        self._limits  = _limits(_type)
+
+    def default(self):
+        """ Fetch a new default value """
+        return self._default
 
-    def pack(self, big_endian=True):
+    def prepare(self, value, parent=None, validate=True):
+        """
+        Validate a value for this field before it's set, returning the value to
+        store. The parent packet is given for fields depending on its values
+        """
+        if validate:
+            self.validate(value, parent)
+        return value
+
+    def validate(self, value, parent=None):
+        """
+        Check the value can be packed, raising struct.error otherwise. Numbers
+        within the range of the field are accepted without packing them
+        """
+        limits = self._limits
+        if limits is not None and isinstance(value, limits[0]) and limits[1] <= value <= limits[2]:
+            return
+        if self.type is None:
+            self.pack(value, parent)
+        else:
+            struct.pack('>' + self.type, value)
+
+    def pack(self, value, parent=None, big_endian=True):
         """ Pack the field value into a raw byte string """
+        raw = bytearray(self.size(value, parent))
+        self.pack_into(value, raw, 0, parent, big_endian)
+        return bytes(raw)
+
+    def pack_into(self, value, buffer, offset=0, parent=None, big_endian=True): #pylint: disable=unused-argument
+        """
+        Pack the field value directly into a writable buffer at the given
+        offset, returning the number of bytes written
+        """
         if self.type is None:
             raise RuntimeError("Invalid field type {}".format(self.type))
         fmt = ('>' if big_endian else '<') + self.type
-        return struct.pack(fmt, self._value)
-
-    def unpack(self, raw, big_endian=True):
-        """ Unpack a given value into this fields value store """
+        struct.pack_into(fmt, buffer, offset, value)
+        return self.size()
+
+    def pack_many_into(self, values, buffer, offset=0, parent=None, big_endian=True):
+        """
+        Pack consecutive values of this field into the buffer, with a single
+        struct call for fixed size fields. Returns the number of bytes written
+        """
+        fmt = self._bulk_fmt(len(values), big_endian)
+        if fmt is None:
+            start = offset
+            for value in values:
+                start += self.pack_into(value, buffer, start, parent, big_endian)
+            return start - offset
+
+        if _overrides(self, '_encode'):
+            values = [self._encode(x) for x in values]
+        struct.pack_into(fmt, buffer, offset, *values)
+        return struct.calcsize(fmt)
+
+    def unpack_many_from(self, buffer, offset=0, count=0, parent=None, big_endian=True):
+        """
+        Unpack consecutive values of this field from the buffer, with a single
+        struct call for fixed size fields. Returns the list of values and the
+        number of bytes consumed
+        """
+        fmt = self._bulk_fmt(count, big_endian)
+        if fmt is None:
+            values = []
+            start = offset
+            for _ in range(count):
+                value, size = self.unpack_from(buffer, start, parent, big_endian)
+                values.append(value)
+                start += size
+            return values, start - offset
+
+        values = struct.unpack_from(fmt, buffer, offset)
+        if _overrides(self, '_decode'):
+            return [self._decode(x) for x in values], struct.calcsize(fmt)
+        return list(values), struct.calcsize(fmt)
+
+    def _bulk_fmt(self, count, big_endian=True):
+        """ Fetch the struct format of consecutive values, if it has one """
+        fmt = self.fmt()
+        if fmt is None:
+            return None
+        # Sized formats can't be repeated with a count prefix
+        fmt = fmt * count if len(fmt) > 1 else str(count) + fmt
+        return ('>' if big_endian else '<') + fmt
+
+    def unpack(self, raw, parent=None, big_endian=True):
+        """ Unpack a raw byte string into a value """
+        return self.unpack_from(raw, 0, parent, big_endian)[0]
+
+    def unpack_from(self, buffer, offset=0, parent=None, big_endian=True): #pylint: disable=unused-argument
+        """
+        Unpack a value from the buffer at the given offset without copying the
+        buffer, returning the value and the number of bytes consumed
+        """
         if self.type is None:
             raise RuntimeError("Invalid field type {}".format(self.type))
         fmt = ('>' if big_endian else '<') + self.type
-        part = raw[:self.size()]
-        self._value = struct.unpack(fmt, part)[0]
+        return struct.unpack_from(fmt, buffer, offset)[0], self.size()
+
+    def fmt(self):
+        """ Fetch the static struct format of this field, or None if variable """
+        return self.type
+
+    def _encode(self, value): #pylint: disable=no-self-use
+        """ Convert a value into the form struct expects when packing """
+        return value
 
-    def size(self):
+    def _decode(self, value): #pylint: disable=no-self-use
+        """ Convert a value returned by struct into the field's value """
+        return value
+
+    def size(self, value=None, parent=None): #pylint: disable=unused-argument
         """ Fetch the size of this field """
-        if self.type in 'xcbB?s':
-            return 1
-        if self.type in 'hH':
-            return 2
-        if self.type in 'iIf':
-            return 4
-        if self.type in 'qQd':
-            return 8
-        raise RuntimeError("Invalid field type {}".format(self.type))
+        if self._static is None:
+            raise RuntimeError("Invalid field type {}".format(self.type))
+        return self._static
+
+    def static_size(self):
+        """ Fetch the size of this field if it never changes, otherwise None """
+        return self._static
+
+    def reference(self): #pylint: disable=no-self-use
+        """ Fetch the name of the field this fields size depends on, if any """
+        return None
+
+    def modified(self, value): #pylint: disable=no-self-use, unused-argument
+        """ Check if a mutable value may have been modified in place since it was unpacked """
+        return False
+
+    def skip(self, buffer, offset=0, parent=None, big_endian=True): #pylint: disable=unused-argument
+        """
+        Fetch the number of bytes a value of this field occupies in the buffer
+        without decoding it, or None if it can only be known by decoding it
+        """
+        return self.static_size()
 
 class SizedField(Field):
     """ Variable sized field """
     def __init__(self, size=None, **kwargs):
         self._size = size
         super(SizedField, self).__init__(**kwargs)
+        self._initial = self._size_val(self._default)
 
-    def size(self):
-        """ Fetch the size of the field """
+    def default(self):
+        """ Fetch the default value, sized to fit the field """
+        return self._initial
+
+    def _count(self, value, parent):
+        """ Fetch the size value, resolving references to other fields """
         if self._size is None:
-            return len(self._value)
-        if isinstance(self._size, six.string_types) and self._parent is not None:
-            return int(self._parent[self._size])
-        if isinstance(self._size, six.string_types) and self._parent is None:
+            return len(value)
+        if isinstance(self._size, six.string_types) and parent is not None:
+            return int(parent[self._size])
+        if isinstance(self._size, six.string_types) and parent is None:
             return 0
         return self._size
 
-    def _size_val(self, value): #pylint: disable=no-self-use
+    def size(self, value=None, parent=None):
+        """ Fetch the size of the field """
+        return self._count(value, parent)
+
+    def static_size(self):
+        """ Only statically sized fields never change size """
+        if isinstance(self._size, six.integer_types):
+            return self._size
+        return None
+
+    def reference(self):
+        """ Fetch the name of the field holding this fields size, if any """
+        if isinstance(self._size, six.string_types):
+            return self._size
+        return None
+
+    def skip(self, buffer, offset=0, parent=None, big_endian=True):
+        """ Sized values can be skipped using their size alone """
+        if self._size is None:
+            return None
+        return self._count(None, parent)
+
+    def fmt(self):
+        """ Only statically sized fields have a struct format """
+        if isinstance(self._size, six.integer_types):
+            return '{}s'.format(self._size)
+        return None
+
+    def _size_val(self, value, parent=None): #pylint: disable=no-self-use, unused-argument
         """ Override this to handle value sizing when set """
         return value
 
-    def set(self, value):
-        """ Set the internal value """
-        # Size the value correctly, and assure any dynamic sizing references
-        # are updated
-        sized_value = self._size_val(value)
-        if isinstance(self._size, six.string_types) and self._parent is not None:
-            self._parent[self._size] = len(sized_value)
-        # Set the value normally
-        super(SizedField, self).set(sized_value)
+    def prepare(self, value, parent=None, validate=True):
+        """ Size the value, and update any dynamic sizing references """
+        sized_value = super(SizedField, self).prepare(self._size_val(value, parent), parent, validate)
+        if isinstance(self._size, six.string_types) and parent is not None:
+            parent[self._size] = len(sized_value)
+        return sized_value
 
 # Standard type fields
 class Char(Field):
@@ -115,6 +304,10 @@ class Bool(Field):
     def __init__(self, name=None, default=False, **kwargs):
         super(Bool, self).__init__(name=name, _type='?', default=default, **kwargs)
 
+    def validate(self, value, parent=None):
+        """ Any value is either true or false """
+        return
+
 class Int8(Field):
     """ Signed Integer Type (1 Byte) """
     def __init__(self, name=None, default=0, **kwargs):
@@ -166,195 +359,586 @@ class Double(Field):
         super(Double, self).__init__(name=name, _type='d', default=default, **kwargs)
 
 # Specialty fields
+class VarInt(Field):
+    """ Unsigned variable length integer, 7 bits per byte (1-10 Bytes) """
+    def __init__(self, name=None, default=0, **kwargs):
+        super(VarInt, self).__init__(name=name, default=default, **kwargs)
+        self._limits = (six.integer_types, 0, 2 ** 64 - 1)
+
+    def validate(self, value, parent=None):
+        """ Only unsigned 64 bit integers can be encoded """
+        limits = self._limits
+        if not isinstance(value, limits[0]) or not limits[1] <= value <= limits[2]:
+            raise struct.error('varint requires 0 <= number <= {}'.format(limits[2]))
+
+    def fmt(self):
+        """ Variable length integers have no struct format """
+        return None
+
+    def size(self, value=None, parent=None): #pylint: disable=unused-argument
+        """ Each byte holds seven bits of the value """
+        return max(1, (int(value or 0).bit_length() + 6) // 7)
+
+    def skip(self, buffer, offset=0, parent=None, big_endian=True): #pylint: disable=unused-argument
+        """ Variable length integers can only be measured by reading them """
+        return None
+
+    def pack_into(self, value, buffer, offset=0, parent=None, big_endian=True): #pylint: disable=unused-argument
+        """ Pack the value least significant bits first, flagging every byte but the last """
+        value = int(value)
+        start = offset
+        while value > 0x7f:
+            struct.pack_into('B', buffer, offset, 0x80 | (value & 0x7f))
+            value >>= 7
+            offset += 1
+        struct.pack_into('B', buffer, offset, value)
+        return offset + 1 - start
+
+    def unpack_from(self, buffer, offset=0, parent=None, big_endian=True): #pylint: disable=unused-argument
+        """ Unpack bytes up to the first one without its continuation bit """
+        value = shift = 0
+        start = offset
+        while True:
+            byte = struct.unpack_from('B', buffer, offset)[0]
+            value |= (byte & 0x7f) << shift
+            offset += 1
+            if not byte & 0x80:
+                return value, offset - start
+            shift += 7
+            if shift >= 70:
+                raise struct.error('varint is longer than 10 bytes')
+
 class Padding(Field):
     """ Padding Field Type (1 Byte) """
     def __init__(self, default=b'\x00', **kwargs):
         super(Padding, self).__init__(_type='x', default=default, **kwargs)
 
-    def pack(self, *args, **kwargs): #pylint: disable=arguments-differ, unused-argument
-        """ Padding always packs to 0x00 """
+    def fmt(self):
+        """ Null padding packs as a pad byte, anything else as a constant char """
+        return 'x' if self._default == b'\x00' else 'c'
+
+    def _encode(self, value):
+        """ Padding always packs its default """
         return self._default
 
-    def unpack(self, *args, **kwargs): #pylint: disable=arguments-differ, unused-argument
-        """ Padding shouldn't unpack """
-        return
+    def pack_into(self, value, buffer, offset=0, *args, **kwargs): #pylint: disable=arguments-differ, unused-argument
+        """ Padding always packs to its default (0x00) """
+        struct.pack_into('c', buffer, offset, self._default)
+        return self.size()
+
+    def unpack_from(self, *args, **kwargs): #pylint: disable=arguments-differ, unused-argument
+        """ Padding shouldn't unpack, but still consumes its byte """
+        return self._default, self.size()
+
+    def pack_many_into(self, values, buffer, offset=0, *args, **kwargs): #pylint: disable=arguments-differ, unused-argument
+        """ Padding always packs to its default (0x00) """
+        size = len(values) * self.size()
+        struct.pack_into('{}s'.format(size), buffer, offset, self._default * len(values))
+        return size
+
+    def unpack_many_from(self, buffer, offset=0, count=0, *args, **kwargs): #pylint: disable=arguments-differ, unused-argument
+        """ Padding shouldn't unpack, but still consumes its bytes """
+        return [self._default] * count, count * self.size()
+
+class Bits(object):
+    """ Named bits of a bit struct (Sub-byte size) """
+    def __init__(self, name=None, size=1, default=0):
+        if size < 1:
+            raise ValueError('Bits need a size of at least one bit')
+        self.name    = name
+        self.size    = size
+        self.default = default
+
+class BitValues(object):
+    """
+    Values of the bits of a bit struct, kept in the integer word they're packed
+    into. Bits are read and written with shifts and masks on the word
+    """
+    __slots__ = ('_field', 'word', 'changed')
+
+    def __init__(self, field, word=0):
+        self._field  = field
+        self.word    = word
+        self.changed = False
+
+    def __getitem__(self, name):
+        shift, mask = self._field.layout[name]
+        return (self.word >> shift) & mask
+
+    def __setitem__(self, name, value):
+        shift, mask = self._field.layout[name]
+        if not isinstance(value, six.integer_types) or not 0 <= value <= mask:
+            raise struct.error('{} requires 0 <= number <= {}'.format(name, mask))
+        self.word = (self.word & ~(mask << shift)) | (value << shift)
+        self.changed = True
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self._field.bits)
+
+    def __eq__(self, rhs):
+        if isinstance(rhs, BitValues):
+            return self.dict() == rhs.dict()
+        return self.dict() == rhs
+
+    def __ne__(self, rhs):
+        return not self == rhs
+
+    # Bit values change in place, so they can't be hashed
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.dict())
+
+    def __deepcopy__(self, memo):
+        return BitValues(self._field, self.word)
+
+    def __reduce__(self):
+        return BitValues, (self._field, self.word)
+
+    def keys(self):
+        """ Fetch the names of the bits """
+        return [bits.name for bits in self._field.bits]
+
+    def values(self):
+        """ Fetch the values of the bits """
+        return [self[name] for name in self.keys()]
+
+    def items(self):
+        """ Fetch the names and values of the bits """
+        return list(zip(self.keys(), self.values()))
+
+    def dict(self):
+        """ Fetch the bits as a dictionary """
+        return dict(self.items())
+
+class BitStruct(Field):
+    """
+    Bit fields packed into a single unsigned integer word (1, 2, 4 or 8 Bytes)
+    The first bits are the most significant ones of the word, and the word is
+    the smallest unsigned integer holding all of them unless one is given
+    """
+    mutable = True
+
+    def __init__(self, name=None, bits=None, word=None):
+        self.bits = list(bits or [])
+        total = sum(x.size for x in self.bits)
+        if word is None:
+            word = next((x for x in (UInt8(), UInt16(), UInt32(), UInt64())
+                         if x.size() * 8 >= total), None)
+        if word is None or word.type not in 'BHIQ' or word.size() * 8 < total:
+            raise ValueError('{} bits don\'t fit in the word of the bit struct'.format(total))
+
+        # Bits are laid out from the most significant bit down
+        self.layout = {}
+        shift = word.size() * 8
+        default = 0
+        for bits in self.bits:
+            shift -= bits.size
+            self.layout[bits.name] = (shift, (1 << bits.size) - 1)
+            if not 0 <= bits.default < 1 << bits.size:
+                raise ValueError('Default of {} doesn\'t fit in {} bits'.format(bits.name, bits.size))
+            default |= bits.default << shift
+        super(BitStruct, self).__init__(name=name, _type=word.type, default=default)
+        self._limits = None
+
+    def default(self):
+        """ Every packet instance gets its own bit values """
+        return BitValues(self, self._default)
+
+    def modified(self, value):
+        """ Bit values keep track of their own modifications """
+        return value.changed
+
+    def prepare(self, value, parent=None, validate=True):
+        """ Bits can be set from other bit values, a word or a dictionary of bits """
+        if isinstance(value, BitValues):
+            value = value.dict()
+        if isinstance(value, dict):
+            values = self.default()
+            for name, bits in value.items():
+                if name not in self.layout:
+                    raise KeyError(name)
+                values[name] = bits
+            values.changed = False
+            return values
+        if validate:
+            self.validate(value, parent)
+        return BitValues(self, value)
+
+    def validate(self, value, parent=None):
+        """ Words must fit the struct format of the bit struct """
+        if isinstance(value, BitValues):
+            value = value.word
+        struct.pack('>' + self.type, value)
+
+    def pack_into(self, value, buffer, offset=0, parent=None, big_endian=True):
+        """ Pack the word holding the bits """
+        return super(BitStruct, self).pack_into(value.word, buffer, offset, parent, big_endian)
+
+    def unpack_from(self, buffer, offset=0, parent=None, big_endian=True):
+        """ Unpack the word holding the bits, which are only split when read """
+        word, size = super(BitStruct, self).unpack_from(buffer, offset, parent, big_endian)
+        return BitValues(self, word), size
+
+    def _encode(self, value):
+        """ Bit values pack as their word """
+        return value.word
+
+    def _decode(self, value):
+        """ Words unpack into bit values """
+        return BitValues(self, value)
 
 class Packet(Field):
     """ Sub-packet (Variable size) """
+    mutable = True
+    volatile = True
+
     def __init__(self, name=None, default=None):
         super(Packet, self).__init__(name=name, default=default)
 
-    def size(self):
+    def default(self):
+        """ Every packet instance gets its own copy of the default sub-packet """
+        return copy.deepcopy(self._default)
+
+    def fmt(self):
+        """ Sub-packets are variable sized """
+        return None
+
+    def modified(self, value):
+        """ Sub-packets keep track of their own modifications """
+        return value is not None and value.modified()
+
+    def validate(self, value, parent=None):
+        """ Sub-packets validate their own values when they're set """
+        if value is not None and not hasattr(value, 'pack_into'):
+            raise TypeError('{} is not a packet'.format(type(value).__name__))
+
+    def size(self, value=None, parent=None):
         """ Use the size of the underlying packet(s) """
-        return self._value.size()
+        if value is not None:
+            return value.size()
+        return 0
 
-    def pack(self, *args, **kwargs): #pylint: disable=arguments-differ, unused-argument
-        """ Have the packet(s) pack itself """
-        if self._value is not None:
-            return self._value.pack()
-        return b''
+    def static_size(self):
+        """ Sub-packets of fixed size packet classes never change size """
+        if self._default is not None:
+            return self._default.__class__._static_size #pylint: disable=protected-access
+        return None
 
-    def unpack(self, raw, *args, **kwargs): #pylint: disable=arguments-differ, unused-argument
-        """ Have the packet unpack the raw data """
-        self._value.unpack(raw)
+    def pack_into(self, value, buffer, offset=0, *args, **kwargs): #pylint: disable=arguments-differ, unused-argument
+        """ Have the packet(s) pack itself """
+        if value is not None:
+            return value.pack_into(buffer, offset)
+        return 0
+
+    def unpack_from(self, buffer, offset=0, parent=None, big_endian=True, retain=False): #pylint: disable=arguments-differ, unused-argument
+        """ Have a new packet unpack the raw data, retaining it along with its parent """
+        packet_cls = self._default.__class__
+        if packet_cls._struct is not None and not retain: #pylint: disable=protected-access
+            row = packet_cls._struct.unpack_from(buffer, offset) #pylint: disable=protected-access
+            return packet_cls._from_struct(row), packet_cls._struct.size #pylint: disable=protected-access
+
+        packet = packet_cls._blank() #pylint: disable=protected-access
+        size = packet.unpack_from(buffer, offset, retain=retain)
+        return packet, size
+
+    def unpack_many_from(self, buffer, offset=0, count=0, *args, **kwargs): #pylint: disable=arguments-differ, unused-argument
+        """ Fixed size packets are all decoded in one pass over the buffer """
+        packet_cls = self._default.__class__
+        if packet_cls._struct is None: #pylint: disable=protected-access
+            return super(Packet, self).unpack_many_from(buffer, offset, count)
+
+        view = memoryview(buffer)[offset:]
+        return packet_cls.unpack_many(view, count), count * packet_cls._struct.size #pylint: disable=protected-access
+
+class BytesField(SizedField):
+    """
+    Byte string field, either sized, prefixed by its length or delimited by a
+    terminator. Prefixed and delimited values are decoded in a single pass
+    over the buffer, without a separate field holding their size
+    """
+    def __init__(self, size=None, prefix=None, terminator=None, **kwargs):
+        if sum(x is not None for x in (size, prefix, terminator)) > 1:
+            raise ValueError('Only one of size, prefix or terminator can be given')
+        if terminator is not None and not terminator:
+            raise ValueError('Terminators need at least one byte')
+        self._prefix     = prefix
+        self._terminator = terminator
+        self._delimited  = prefix is not None or terminator is not None
+        super(BytesField, self).__init__(size=size, **kwargs)
+
+    def validate(self, value, parent=None):
+        """ Delimited values must be able to hold their delimiter """
+        raw = self._encode(value)
+        if self._prefix is not None:
+            self._prefix.validate(len(raw))
+        elif self._terminator is not None and self._terminator in raw:
+            raise struct.error('{!r} holds its terminator'.format(value))
+
+    def size(self, value=None, parent=None):
+        """ Delimited values take their encoded size and their delimiter """
+        if not self._delimited:
+            return super(BytesField, self).size(value, parent)
+        size = len(self._encode(self._initial if value is None else value))
+        if self._prefix is not None:
+            return self._prefix.size(size) + size
+        return size + len(self._terminator)
+
+    def skip(self, buffer, offset=0, parent=None, big_endian=True):
+        """ Delimited values are skipped over their prefix or up to their terminator """
+        if self._prefix is not None:
+            try:
+                size, prefix = self._prefix.unpack_from(buffer, offset, parent, big_endian)
+            except struct.error:
+                return None
+            return prefix + size
+        if self._terminator is not None:
+            end = _find(buffer, self._terminator, offset)
+            return None if end < 0 else end - offset + len(self._terminator)
+        return super(BytesField, self).skip(buffer, offset, parent, big_endian)
+
+    def pack_into(self, value, buffer, offset=0, parent=None, big_endian=True):
+        """ Pack the encoded value, along with its delimiter if it has one """
+        raw = self._encode(value)
+        if self._prefix is not None:
+            prefix = self._prefix.pack_into(len(raw), buffer, offset, parent, big_endian)
+            struct.pack_into(str(len(raw)) + 's', buffer, offset + prefix, raw)
+            return prefix + len(raw)
+        if self._terminator is not None:
+            raw += self._terminator
+            struct.pack_into(str(len(raw)) + 's', buffer, offset, raw)
+            return len(raw)
+
+        size = self.size(value, parent)
+        fmt = ('>' if big_endian else '<') + str(size) + 's'
+        struct.pack_into(fmt, buffer, offset, raw)
+        return size
+
+    def unpack_from(self, buffer, offset=0, parent=None, big_endian=True):
+        """ Unpack the value, finding its size from its delimiter if it has one """
+        if self._prefix is not None:
+            size, prefix = self._prefix.unpack_from(buffer, offset, parent, big_endian)
+            raw = struct.unpack_from(str(size) + 's', buffer, offset + prefix)[0]
+            return self._decode(raw), prefix + size
+        if self._terminator is not None:
+            end = _find(buffer, self._terminator, offset)
+            if end < 0:
+                raise struct.error('unpack_from requires a buffer holding the terminator {!r}'.format(
+                    self._terminator))
+            raw = struct.unpack_from(str(end - offset) + 's', buffer, offset)[0]
+            return self._decode(raw), end - offset + len(self._terminator)
+
+        size = self._count(b'', parent)
+        fmt = ('>' if big_endian else '<') + str(size) + 's'
+        return self._decode(struct.unpack_from(fmt, buffer, offset)[0]), size
 
-class Raw(SizedField):
+class Raw(BytesField):
     """ Raw Data Type (Variable Size) """
     def __init__(self, name=None, default=b'', **kwargs):
         super(Raw, self).__init__(name=name, _type='s', default=default, **kwargs)
 
-    def _size_val(self, value):
+    def _size_val(self, value, parent=None):
         """ Modify value to the exact size, padding with null bytes when needed """
         # Only size the value to fit with static sizing
         if isinstance(self._size, six.integer_types):
-            size = self.size()
+            size = self._size
             remainder = size - len(value)
             for _ in range(remainder):
                 value += b'\x00'
             value = value[:size]
         return value
 
-    def pack(self, big_endian=True):
-        """ Raw data always uses a size value, and packs with null-bytes """
-        fmt = ('>' if big_endian else '<') + str(self.size()) + 's'
-        return struct.pack(fmt, self._value)
-
-    def unpack(self, raw, big_endian=True):
-        """ Raw data always uses a size value and packs with null bytes """
-        size = self.size()
-        fmt = ('>' if big_endian else '<') + str(size) + 's'
-        part = raw[:size]
-        self._value = struct.unpack(fmt, part)[0]
+    def validate(self, value, parent=None):
+        """ Raw data has to be bytes """
+        struct.pack('>s', value)
+        super(Raw, self).validate(value, parent)
 
-class String(SizedField):
+class String(BytesField):
     """ String Type (Variable Size) """
     def __init__(self, name=None, default=u'', encoding='utf8', **kwargs):
         self.encoding = encoding
         super(String, self).__init__(name=name, default=default, **kwargs)
 
-    def _size_val(self, value):
+    def _size_val(self, value, parent=None):
         """ Modify value to the fit within the size """
         # Only size the value if a static size is given
         if isinstance(self._size, six.integer_types):
-            return value[:self.size()]
+            return value[:self._size]
         return value
 
-    def pack(self, big_endian=True):
-        """ Pack internal unicode value into a raw byte string """
-        fmt = ('>' if big_endian else '<') + str(self.size()) + 's'
-        raw_value = bytes(self._value, encoding=self.encoding)
-        return struct.pack(fmt, raw_value)
+    def _encode(self, value):
+        """ Encode the unicode value into raw bytes """
+        return bytes(value, encoding=self.encoding)
 
-    def unpack(self, raw, big_endian=True):
-        """ Unpack a raw byte string into a unicode value """
-        size = self.size()
-        fmt = ('>' if big_endian else '<') + str(size) + 's'
-        part = raw[:size]
-        raw_value = struct.unpack(fmt, part)[0]
-        stripped = raw_value.rstrip(b'\x00')
-        self._value = six.text_type(stripped.decode(self.encoding))
+    def _decode(self, value):
+        """ Decode raw bytes into a unicode value, stripping null padding unless delimited """
+        if self._delimited:
+            return six.text_type(value.decode(self.encoding))
+        return six.text_type(value.rstrip(b'\x00').decode(self.encoding))
 
 class List(SizedField):
-    """ List of fields (Variable size) """
-    def __init__(self, name=None, field=None, **kwargs):
+    """
+    List of fields (Variable size)
+    Lists of numeric fields can store their values in an array.array instead
+    of a list, which is packed and unpacked as a single block of memory
+    """
+    mutable = True
+
+    def __init__(self, name=None, field=None, array=False, **kwargs): #pylint: disable=redefined-outer-name
         self._field = field
+        self._typecode = _typecode(field) if array else None
         super(List, self).__init__(name=name, **kwargs)
+        # Lists can be modified in place, so only lists whose size only
+        #  depends on their count can be trusted not to change size
+        self.volatile = self._size is None or field.static_size() is None
+
+    def default(self):
+        """ Every packet instance gets its own list of default values """
+        return self._size_val(None)
+
+    def modified(self, value): #pylint: disable=unused-argument
+        """ Lists aren't tracked, so they're always assumed to be modified """
+        return True
 
-    def _create_field(self, value=None):
-        """ Create a new field instance with the optional value """
-        field = copy.deepcopy(self._field)
-        if value:
-            field.set(value)
-        field._register(self._parent) #pylint: disable=protected-access
-        return field
-
-    def _size_val(self, value):
-        """ Transform value(s) into a list of appropriate fields """
-        # Ensure the value is a list of fields with their internal values set
+    def fmt(self):
+        """ Lists are variable sized """
+        return None
+
+    def _size_val(self, value, parent=None):
+        """ Transform value(s) into a list of appropriate values """
+        if self._typecode is not None:
+            return self._size_array(value)
+
+        # Ensure the value is a list of prepared values, validated by the list
         if isinstance(value, (list, tuple)):
-            fields = [self._create_field(x) for x in value]
+            values = [self._field.prepare(x, parent, False) for x in value]
         elif value:
-            fields = [self._create_field(value)]
+            values = [self._field.prepare(value, parent, False)]
         else:
-            fields = []
+            values = []
 
         # Only modify the size of the list if the the field has a static size
         if isinstance(self._size, six.integer_types):
-            remainder = self._size - len(fields)
+            remainder = self._size - len(values)
             for _ in range(remainder):
-                field = self._create_field()
-                fields.append(field)
-            fields = fields[:self._size]
-
-        return fields
-
-    @property
-    def value(self):
-        """ Read only value to force set and rest commands """
-        raw_values = []
-        for field in self._value:
-            raw_values.append(field.value)
-        return raw_values
-
-    def size(self):
-        """ Size of the field is the sum of the all nested fields """
-        # In order to facilitate the edge case of a dynamically sized field
-        #  whose size has been updated, but the underlying list hasn't changed
-        #  size yet, we generate a copy of the fields list at the expected size
-        #  and use that to calculate the total size instead. The new fields
-        #  aren't saved because it feels wrong to have size be a non const safe
-        #  operation.
-        if self._value is None:
-            fields = []
-        else:
-            fields = self._value
-
-        if self._size is None:
-            count = len(fields)
-        elif isinstance(self._size, six.string_types) and self._parent is not None:
-            count = self._parent[self._size]
-        elif isinstance(self._size, six.string_types) and self._parent is None:
-            count = 0
+                values.append(self._field.default())
+            values = values[:self._size]
+
+        return values
+
+    def validate(self, value, parent=None):
+        """ Validate every value, arrays are already validated by their type code """
+        if self._typecode is None:
+            validate = self._field.validate
+            for item in value:
+                validate(item, parent)
+
+    def _size_array(self, value):
+        """ Transform value(s) into an array, the array type code validates them """
+        # Arrays of the right type are stored as is, without copying them
+        if isinstance(value, array.array) and value.typecode == self._typecode:
+            values = value
+        elif isinstance(value, (list, tuple, array.array)):
+            values = array.array(self._typecode, value)
+        elif value:
+            values = array.array(self._typecode, [value])
         else:
-            count = self._size
-
-        remainder = count - len(fields)
-        for _ in range(remainder):
-            field = self._create_field()
-            fields.append(field)
-        fields = fields[:count]
+            values = array.array(self._typecode)
+
+        # Only modify the size of the array if the the field has a static size
+        if isinstance(self._size, six.integer_types) and len(values) != self._size:
+            remainder = max(self._size - len(values), 0)
+            values = values[:self._size] + array.array(self._typecode, [self._field.default()] * remainder)
+        return values
+
+    def _values(self, value, parent):
+        """
+        Fetch exactly the expected count of values. In order to facilitate the
+        edge case of a dynamically sized field whose size has been updated, but
+        the underlying list hasn't changed size yet, missing values are
+        defaulted
+        """
+        if value is None:
+            value = self._size_val(None)
+        count = self._count(value, parent)
+        if count == len(value):
+            return value
+        if count < len(value):
+            return value[:count]
+        missing = [self._field.default() for _ in range(count - len(value))]
+        if self._typecode is not None:
+            return value + array.array(self._typecode, missing)
+        return value + missing
+
+    def _swap(self, big_endian):
+        """ Check if array values need their byte order swapped """
+        return self._field.static_size() > 1 and big_endian != (sys.byteorder == 'big')
+
+    def static_size(self):
+        """ Statically sized lists of fixed size fields never change size """
+        size = self._field.static_size()
+        if isinstance(self._size, six.integer_types) and size is not None:
+            return self._size * size
+        return None
+
+    def skip(self, buffer, offset=0, parent=None, big_endian=True):
+        """ Lists of fixed size fields can be skipped using their count alone """
+        size = self._field.static_size()
+        if self._size is None or size is None:
+            return None
+        return self._count(None, parent) * size
+
+    def size(self, value=None, parent=None):
+        """ Size of the field is the sum of the all nested fields """
+        size = self._field.static_size()
+        if size is not None:
+            return self._count(value if value is not None else [], parent) * size
 
         result = 0
-        for field in fields:
-            result += field.size()
+        for item in self._values(value, parent):
+            result += self._field.size(item, parent)
         return result
 
-    def pack(self, big_endian=True):
-        """ Pack the list of sub-fields into bytes """
-        data = b''
-        if isinstance(self._value, (list, tuple)):
-            for field in self._value:
-                data += field.pack()
-        return data
+    def pack_into(self, value, buffer, offset=0, parent=None, big_endian=True):
+        """ Pack the list of values into the buffer """
+        values = self._values(value, parent)
+        if self._typecode is None:
+            return self._field.pack_many_into(values, buffer, offset, parent, big_endian)
 
-    def unpack(self, raw, big_endian=True):
-        """ Unpack the raw data into the sub-fields """
+        if self._swap(big_endian):
+            values = array.array(self._typecode, values)
+            values.byteswap()
+        try:
+            raw = memoryview(values).cast('B')
+        except (AttributeError, TypeError):
+            raw = values.tostring()
+        if len(buffer) - offset < len(raw):
+            raise struct.error('pack_into requires a buffer of at least {} bytes'.format(len(raw)))
+        buffer[offset:offset + len(raw)] = raw
+        return len(raw)
+
+    def unpack_from(self, buffer, offset=0, parent=None, big_endian=True):
+        """ Unpack the raw data into a list of values """
         # Unpacking requires knowing the underlying size of the data before hand
         if self._size is None:
             raise RuntimeError("Can't unpack raw data into a field of variable size")
 
-        if isinstance(self._size, six.string_types) and self._parent is not None:
-            size = self._parent[self._size]
-        elif isinstance(self._size, six.string_types) and self._parent is None:
-            size = 0
+        count = self._count(None, parent)
+        if self._typecode is None:
+            return self._field.unpack_many_from(buffer, offset, count, parent, big_endian)
+
+        values = array.array(self._typecode)
+        size = count * values.itemsize
+        if len(buffer) - offset < size:
+            raise struct.error('unpack_from requires a buffer of at least {} bytes'.format(size))
+        raw = memoryview(buffer)[offset:offset + size]
+        if hasattr(values, 'frombytes'):
+            values.frombytes(raw)
         else:
-            size = self._size
-
-        start = 0
-        self._value = []
-        for _ in range(size):
-            part = raw[start:]
-            field = self._create_field()
-            field.unpack(part)
-            self._value.append(field)
-            start += field.size()
+            values.fromstring(raw.tobytes())
+        if self._swap(big_endian):
+            values.byteswap()
+        return values, size
@@ -0,0 +1,376 @@
+""" IO classes - Read and write packets from files and sockets """
+from __future__ import unicode_literals
+import os
+import mmap
+import struct
+import bisect
+import hashlib
+import six
+from packeteer import packets, fields
+try:
+    from concurrent import futures
+except ImportError:
+    futures = None
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+class _Index(packets.LittleEndian):
+    """ Record offset index """
+    __slots__ = ()
+    fields = [
+        fields.UInt64('size'),
+        fields.Double('mtime'),
+        fields.UInt64('layout'),
+        fields.UInt64('count'),
+        fields.List('offsets', fields.UInt64(), size='count', array=True),
+    ]
+
+def _describe(value):
+    """
+    Describe the layout of a packet class, union or field with plain values
+    only, so it's the same in every process
+    """
+    if isinstance(value, packets.Union):
+        classes = sorted((repr(x), _describe(y)) for x, y in six.iteritems(value._classes)) #pylint: disable=protected-access
+        return ['Union', _describe(value.header), value.name, classes, _describe(value.default)]
+    if isinstance(value, packets.BasePacket):
+        value = type(value)
+    if isinstance(value, type) and issubclass(value, packets.BasePacket):
+        return [value.__name__, value.big_endian, [_describe(x) for x in value.fields]]
+    if isinstance(value, (fields.Field, fields.Bits)):
+        return [type(value).__name__, sorted((x, _describe(y)) for x, y in six.iteritems(vars(value)))]
+    if isinstance(value, (list, tuple)):
+        return [_describe(x) for x in value]
+    if isinstance(value, dict):
+        return sorted((repr(x), _describe(y)) for x, y in six.iteritems(value))
+    return repr(value)
+
+def _layout(packet_cls):
+    """ Fetch an identifier of the layout of a packet class or union """
+    digest = hashlib.sha1(repr(_describe(packet_cls)).encode('utf8')).digest()
+    return struct.unpack('<Q', digest[:8])[0]
+
+def _index(buffer, packet_cls):
+    """ Find the offsets of every complete record in a buffer, and the end of the last one """
+    offsets = _Index.fields[-1].default()
+    offset = 0
+    offsets.append(offset)
+    while offset < len(buffer):
+        size = packet_cls.frame_size(buffer, offset)
+        if size is None or len(buffer) - offset < size:
+            break
+        if size == 0:
+            raise ValueError("Records without a size can't be indexed")
+        offset += size
+        offsets.append(offset)
+    return offsets
+
+class MappedReader(object):
+    """
+    Memory mapped packet reader
+    Gives random access to the records of a file, without reading it into
+    memory. Records of fixed size packet classes are found by their index
+    alone, others by an index of their offsets built in one pass over the
+    file. The index is kept next to the file, and reused as long as neither
+    the file nor the layout of the packet class change.
+
+    Records are either of a single packet class, or of any class of a union.
+    An incomplete record at the end of the file is ignored.
+    """
+    def __init__(self, path, packet_cls, index_path=None, persist=True):
+        self.path = path
+        self.packet_cls = packet_cls
+        self.index_path = index_path or path + '.idx'
+
+        with open(path, 'rb') as fileobj:
+            stat = os.fstat(fileobj.fileno())
+            # Empty files can't be mapped
+            if stat.st_size:
+                self._map = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._map = b''
+
+        self._size = getattr(packet_cls, '_static_size', None)
+        self._offsets = None
+        if self._size is not None:
+            self._count = len(self._map) // self._size if self._size else 0
+        else:
+            self._offsets = self._load_index(stat)
+            if self._offsets is None:
+                self._offsets = _index(self._map, packet_cls)
+                if persist:
+                    self._save_index(stat)
+            self._count = len(self._offsets) - 1
+
+    def _load_index(self, stat):
+        """ Load the persisted index, if it's still up to date """
+        try:
+            with open(self.index_path, 'rb') as fileobj:
+                index = _Index.from_raw(fileobj.read())
+        except (IOError, OSError, struct.error):
+            return None
+        if (index['size'] != stat.st_size or index['mtime'] != stat.st_mtime or
+                index['layout'] != _layout(self.packet_cls)):
+            return None
+        return index['offsets']
+
+    def _save_index(self, stat):
+        """ Persist the index next to the file """
+        index = _Index(size=stat.st_size, mtime=stat.st_mtime, layout=_layout(self.packet_cls),
+                       offsets=self._offsets)
+        try:
+            with open(self.index_path, 'wb') as fileobj:
+                fileobj.write(index.pack())
+        except (IOError, OSError):
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for idx in range(self._count):
+            yield self._decode(idx)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._count)
+            # Consecutive fixed size records are decoded in a single call
+            if self._size and step == 1:
+                count = max(stop - start, 0)
+                return self.packet_cls.unpack_many(memoryview(self._map)[start * self._size:], count)
+            return [self._decode(idx) for idx in range(start, stop, step)]
+
+        idx = key + self._count if key < 0 else key
+        if not 0 <= idx < self._count:
+            raise IndexError(key)
+        return self._decode(idx)
+
+    def offset(self, idx):
+        """ Fetch the offset of a record in the file """
+        if self._offsets is None:
+            return idx * self._size
+        return self._offsets[idx]
+
+    def _decode(self, idx):
+        """ Decode a record """
+        # Views of the map would keep it from being closed
+        if isinstance(self.packet_cls, packets.Union):
+            return self.packet_cls.unpack_from(self._map, self.offset(idx))[0]
+        packet = self.packet_cls._blank() #pylint: disable=protected-access
+        packet.unpack_from(self._map, self.offset(idx))
+        return packet
+
+    def close(self):
+        """ Unmap the file """
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+
+class PacketWriter(object):
+    """
+    Buffered packet writer
+    Packs packets back to back into a reusable buffer, which is written to a
+    file, or sent over a socket, in a single call whenever it's full. Packets
+    larger than the buffer are written on their own
+    """
+    def __init__(self, target, buffer_size=65536):
+        self.target = target
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self._used = 0
+        self._sendall = getattr(target, 'sendall', None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.flush()
+
+    def write(self, packet):
+        """ Add a packet to the buffer, writing the buffer first if it's full """
+        size = packet.size()
+        if size > len(self._buffer) - self._used:
+            self.flush()
+            if size > len(self._buffer):
+                self._send(packet.pack())
+                return
+        self._used += packet.pack_into(self._view, self._used)
+
+    def write_many(self, packets):
+        """ Add many packets to the buffer """
+        for packet in packets:
+            self.write(packet)
+
+    def flush(self):
+        """ Write the packets in the buffer """
+        if self._used:
+            self._send(self._view[:self._used])
+            self._used = 0
+        flush = getattr(self.target, 'flush', None)
+        if flush is not None:
+            flush()
+
+    def _send(self, data):
+        """ Write data to the target, in full """
+        if self._sendall is not None:
+            self._sendall(data)
+            return
+        # Unbuffered files may only write part of the data at once
+        view = memoryview(data)
+        while view:
+            written = self.target.write(view)
+            if written is None or written >= len(view):
+                break
+            view = view[written:]
+
+def _chunks(offsets, chunk_size):
+    """ Split records into chunks of about the given size, given their offsets and the end """
+    bounds = []
+    first = 0
+    while first < len(offsets) - 1:
+        last = bisect.bisect_right(offsets, offsets[first] + chunk_size, first + 1) - 1
+        last = max(last, first + 1)
+        bounds.append((offsets[first], offsets[last]))
+        first = last
+    return bounds
+
+def _attach(name):
+    """
+    Attach to shared memory created by another process, which unlinks it. Worker
+    processes share the resource tracker of their parent, so tracking the
+    memory again before Python 3.13 is harmless
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+def _unpack_many(buffer, packet_cls, columns):
+    """ Decode every record of a buffer, of a packet class or of any class of a union """
+    if not isinstance(packet_cls, packets.Union):
+        return packet_cls.unpack_many(buffer, columns=columns)
+    records = []
+    offset = 0
+    while offset < len(buffer):
+        packet, size = packet_cls.unpack_from(buffer, offset)
+        records.append(packet)
+        if size == 0:
+            break
+        offset += size
+    return records
+
+def _decode_chunk(source, packet_cls, start, end, columns):
+    """ Decode the records between two offsets of a source, in a worker process """
+    kind, value = source
+    if kind == 'bytes':
+        return _unpack_many(value, packet_cls, columns)
+
+    if kind == 'path':
+        with open(value, 'rb') as fileobj:
+            mapped = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = mapped
+    else:
+        mapped = _attach(value)
+        buffer = mapped.buf
+    try:
+        view = memoryview(buffer)[start:end]
+        try:
+            return _unpack_many(view, packet_cls, columns)
+        finally:
+            view.release()
+    finally:
+        del buffer
+        mapped.close()
+
+def _merge(results, packet_cls, columns):
+    """ Merge the decoded chunks, in order """
+    if not columns:
+        merged = []
+        for result in results:
+            merged.extend(result)
+        return merged
+
+    merged = {name: [] for name in packet_cls._fnames} #pylint: disable=protected-access
+    for result in results:
+        for name, values in six.iteritems(result):
+            merged[name].extend(values)
+    return merged
+
+def decode_parallel(source, packet_cls, workers=None, ordered=True, columns=False, chunk_size=1 << 22):
+    """
+    Decode the consecutive records of a file or buffer with a pool of worker
+    processes. The records are split in chunks of about chunk_size bytes,
+    which the workers decode straight out of the memory mapped file, or out of
+    shared memory holding a copy of the buffer.
+
+    Returns the list of packets, or a dictionary of per-field value lists with
+    columns=True. Unordered decoding instead returns an iterator of the packets,
+    or of the columns of each chunk, as soon as their chunk is decoded.
+
+    Records are either of a single packet class, or of any class of a union,
+    which can't be decoded into columns. Packet classes must be importable
+    by the worker processes
+    """
+    if futures is None:
+        raise ImportError('concurrent.futures is required for parallel decoding')
+    if columns and isinstance(packet_cls, packets.Union):
+        raise ValueError('Records of a union have no common columns')
+
+    if isinstance(source, six.string_types):
+        with MappedReader(source, packet_cls) as reader:
+            offsets = reader._offsets #pylint: disable=protected-access
+            size, count = len(reader._map), len(reader) #pylint: disable=protected-access
+        shared = ('path', source)
+    else:
+        size = len(memoryview(source))
+        record = getattr(packet_cls, '_static_size', None)
+        offsets = None if record else _index(source, packet_cls)
+        count = size // record if offsets is None else len(offsets) - 1
+        shared = None
+
+    # Fixed size records are split by their count alone
+    if offsets is None:
+        record = packet_cls._static_size #pylint: disable=protected-access
+        per_chunk = max(chunk_size // record, 1)
+        bounds = [(idx * record, min(idx + per_chunk, count) * record)
+                  for idx in range(0, count, per_chunk)]
+    else:
+        bounds = _chunks(offsets, chunk_size)
+
+    memory = None
+    if shared is None and shared_memory is not None and size:
+        memory = shared_memory.SharedMemory(create=True, size=size)
+        memory.buf[:size] = source
+        shared = ('memory', memory.name)
+
+    def decode():
+        """ Decode the chunks, yielding them in the order they're decoded """
+        try:
+            with futures.ProcessPoolExecutor(max_workers=workers) as executor:
+                pending = []
+                for start, end in bounds:
+                    chunk = ('bytes', bytes(source[start:end])) if shared is None else shared
+                    pending.append(executor.submit(_decode_chunk, chunk, packet_cls, start, end, columns))
+                if ordered:
+                    for future in pending:
+                        yield future.result()
+                else:
+                    for future in futures.as_completed(pending):
+                        yield future.result()
+        finally:
+            if memory is not None:
+                memory.close()
+                memory.unlink()
+
+    if ordered:
+        return _merge(decode(), packet_cls, columns)
+    if columns:
+        return decode()
+    return (packet for chunk in decode() for packet in chunk)
@@ -1,51 +1,440 @@
 """ Packet base class and common derivatives """
 from __future__ import unicode_literals
+import sys
 import copy
+import time
+import binascii
+import struct
+import threading
 import six
-from packeteer import fields
+from packeteer import fields, codegen
+from packeteer.fields import _overrides
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
-class BasePacket(object):
+# Placeholder for the values of lazily unpacked fields that aren't decoded yet
+PENDING = object()
+
+# Numpy equivalents of the struct formats of fixed size fields
+NUMPY_TYPES = {
+    'c': 'S1', '?': '?',
+    'b': 'i1', 'h': 'i2', 'i': 'i4', 'q': 'i8',
+    'B': 'u1', 'H': 'u2', 'I': 'u4', 'Q': 'u8',
+    'f': 'f4', 'd': 'f8',
+}
+
+def _spaced_hex(raw):
+    """ Format bytes as hex digit pairs separated by spaces """
+    if sys.version_info >= (3, 8):
+        return raw.hex(' ')
+    digits = binascii.hexlify(raw).decode('ascii')
+    return ' '.join(digits[idx:idx + 2] for idx in range(0, len(digits), 2))
+
+def iter_hex_dump(buffer, annotations=None):
     """
-    Packet Base class
-    Do not derive from this base class, use BigEndian and LittleEndian instead
+    Iterate the lines of a human readable hex dump of any buffer, 16 bytes per
+    line. Annotations are (offset, label) pairs, listed at the end of the line
+    holding their offset
     """
-    big_endian = None
-    fields = []
+    view = memoryview(buffer)
+    labels = {}
+    for offset, label in annotations or ():
+        labels.setdefault(offset // 16, []).append(label)
+
+    for start in range(0, len(view), 16):
+        # Visual pleasing space in the middle of 16 bytes
+        line = '{:04x} {}'.format(start, _spaced_hex(view[start:start + 8]))
+        if len(view) - start > 8:
+            line += '  ' + _spaced_hex(view[start + 8:start + 16])
+        if start // 16 in labels:
+            line = '{:<53}  {}'.format(line, ', '.join(labels[start // 16]))
+        yield line
+
+def hex_dump(buffer, annotations=None):
+    """ Fetch a human readable hex dump of any buffer """
+    return '\n'.join(iter_hex_dump(buffer, annotations))
 
-    def __init__(self, **kwargs):
+class PacketMeta(type):
+    """
+    Packet meta class
+    Compiles the field layout of each packet class once, at definition time
+    """
+    def __new__(mcs, name, bases, attrs):
         # Bootstrap the doc-string for the packet name for convenience
-        if not hasattr(self, 'name') and self.__doc__:
-            self.name = self.__doc__.strip()
-        elif not hasattr(self, 'name'):
-            self.name = 'Unknown Packet'
+        if 'name' in attrs:
+            attrs['_named'] = True
+        elif not any(getattr(base, '_named', False) for base in bases):
+            doc = attrs.get('__doc__')
+            attrs['name'] = doc.strip() if doc else 'Unknown Packet'
+            attrs['_named'] = False
+        return super(PacketMeta, mcs).__new__(mcs, name, bases, attrs)
 
-        # Prevent sharing field instances by creating unique copies
-        self.fields = copy.deepcopy(self.fields)
+    def __init__(cls, name, bases, attrs):
+        super(PacketMeta, cls).__init__(name, bases, attrs)
+        cls._compile()
 
+    def _compile(cls):
+        """ Pre-compute the field lookup tables and default values """
         # Create a lookup table of all non padding fields
-        self._fnames = {}
-        self._fidx = {}
-        sparse_idx = 0
-        for idx, field in enumerate(self.fields):
-            field._register(self) #pylint: disable=protected-access
+        cls._fnames = {}
+        cls._fidx = {}
+        cls._keyed = []
+        for idx, field in enumerate(cls.fields):
             if not isinstance(field, fields.Padding):
-                self._fnames[field.name] = idx
-                self._fidx[sparse_idx] = idx
-                sparse_idx += 1
+                cls._fnames[field.name] = idx
+                cls._fidx[len(cls._keyed)] = idx
+                cls._keyed.append((idx, field))
+
+        # Immutable defaults are shared, mutable ones are created per instance
+        cls._defaults = [field.default() for field in cls.fields]
+        cls._fresh = [idx for idx, field in enumerate(cls.fields) if field.mutable]
+
+        cls._compile_sizes()
+        cls._compile_struct()
+        # Pack and unpack functions are only generated when they're first used
+        cls._code = None
+
+    def _compile_sizes(cls):
+        """
+        Pre-compute the static size and offsets of fields. Dynamic fields whose
+        size only changes when they, or the field holding their size, are set
+        are cached by instances. Volatile fields are always recalculated
+        """
+        cls._fixed_size = 0
+        cls._offsets = []
+        cls._cached = []
+        cls._volatile = []
+        cls._sizers = set()
+        cls._referenced = set()
+        for idx, field in enumerate(cls.fields):
+            # Offsets are static up until the first dynamically sized field
+            if not cls._cached and not cls._volatile:
+                cls._offsets.append(cls._fixed_size)
+
+            size = field.static_size()
+            if size is not None:
+                cls._fixed_size += size
+                continue
+            if field.volatile:
+                cls._volatile.append(idx)
+            else:
+                cls._cached.append(idx)
+                cls._sizers.add(idx)
+            # Fields sizing others, volatile or not, have to be decoded to measure packets
+            if field.reference() is not None:
+                cls._sizers.add(cls._fnames[field.reference()])
+                cls._referenced.add(cls._fnames[field.reference()])
+
+        cls._static_size = None
+        if not cls._cached and not cls._volatile:
+            cls._static_size = cls._fixed_size
 
-        # Set field values to what's given or their defaults
+        # The least number of bytes taken by the fields from each index on
+        cls._tails = [0] * (len(cls.fields) + 1)
+        for idx in reversed(range(len(cls.fields))):
+            cls._tails[idx] = cls._tails[idx + 1] + (cls.fields[idx].static_size() or 0)
+
+    def _compile_struct(cls):
+        """
+        Pre-compute a single struct for packets built only from fixed size
+        fields, so they can be packed and unpacked in one call
+        """
+        cls._struct = None
+        cls._packed = []
+        cls._unpacked = []
+        cls._layout = []
+        if cls.big_endian is None:
+            return
+
+        fmt = '>' if cls.big_endian else '<'
+        for idx, field in enumerate(cls.fields):
+            field_fmt = field.fmt()
+            if field_fmt is None:
+                cls._layout = []
+                return
+            cls._layout.append((idx, field_fmt, struct.calcsize(fmt)))
+            fmt += field_fmt
+            if field_fmt == 'x':
+                continue
+            encode = field._encode if _overrides(field, '_encode') else None #pylint: disable=protected-access
+            decode = field._decode if _overrides(field, '_decode') else None #pylint: disable=protected-access
+            cls._packed.append((idx, encode))
+            cls._unpacked.append(None if isinstance(field, fields.Padding) else (idx, decode))
+        cls._struct = struct.Struct(fmt)
+
+@six.add_metaclass(PacketMeta)
+class BasePacket(object):
+    """
+    Packet Base class
+    Do not derive from this base class, use BigEndian and LittleEndian instead
+    """
+    __slots__ = ('_values', '_size', '_lazy', '_source', '_dirty')
+    big_endian = None
+    fields = []
+
+    def __init__(self, _validate=True, **kwargs):
+        # Field instances are shared by the class, only values are per instance
+        self._values = self._new_values()
+        self._size = None
+        self._lazy = None
+        self._source = None
+        self._dirty = None
+
+        # Set field values to what's given or their defaults, trusted values
+        #  can skip their validation with _validate=False
         for name, value in six.iteritems(kwargs):
             idx = self._fnames[name]
-            field = self.fields[idx]
-            field.set(value)
+            self._values[idx] = self.fields[idx].prepare(value, self, _validate)
+        self._size = None
+
+    @classmethod
+    def _create(cls, values):
+        """ Create a new packet holding the given values, skipping the constructor """
+        packet = cls.__new__(cls)
+        packet._values = values #pylint: disable=protected-access
+        packet._size = None #pylint: disable=protected-access
+        packet._lazy = None #pylint: disable=protected-access
+        packet._source = None #pylint: disable=protected-access
+        packet._dirty = None #pylint: disable=protected-access
+        return packet
+
+    @classmethod
+    def _new_values(cls):
+        """ Create a new list of default values """
+        values = list(cls._defaults)
+        for idx in cls._fresh:
+            values[idx] = cls.fields[idx].default()
+        return values
+
+    @classmethod
+    def _blank(cls):
+        """ Create a new packet of default values to decode into """
+        return cls()
 
     @classmethod
-    def from_raw(cls, packed, partial=False):
-        """ Initialize a new packet from the raw bytes """
-        instance = cls()
-        instance.unpack(packed, partial)
+    def from_raw(cls, packed, partial=False, lazy=False, retain=False):
+        """
+        Initialize a new packet from the raw bytes (or any buffer). Lazy packets
+        only decode their fields when they're first accessed, retaining packets
+        hold on to the bytes to pack them again
+        """
+        instance = cls._blank()
+        instance.unpack_from(packed, 0, partial, lazy, retain)
         return instance
 
+    @classmethod
+    def _generated(cls):
+        """ Fetch the pack and unpack functions generated for the packet class """
+        if cls._code is None:
+            cls._code = codegen.compile_packet(cls)
+        return cls._code
+
+    @classmethod
+    def generated_source(cls):
+        """ Fetch the source of the pack and unpack functions generated for the packet class """
+        return codegen.source(cls)
+
+    @classmethod
+    def frame_size(cls, buffer, offset=0):
+        """
+        Fetch the size of the packet starting at the offset of a buffer, which
+        may only hold the start of it, or None if it doesn't hold enough of the
+        packet to tell yet
+        """
+        size, exact = cls.measure(buffer, offset)
+        return size if exact else None
+
+    @classmethod
+    def measure(cls, buffer, offset=0):
+        """
+        Measure the packet starting at the offset of a buffer, which may only
+        hold the start of it. Returns the size of the packet and True once it's
+        known, otherwise the least number of bytes the packet takes and False.
+        Only the fields sizing other fields are decoded
+        """
+        if cls._static_size is not None:
+            return cls._static_size, True
+
+        packet = cls._blank()
+        values = packet._values
+        start = offset
+        for idx, field in enumerate(cls.fields):
+            # Dynamic sub-packets are measured the same way
+            if isinstance(field, fields.Packet) and field.static_size() is None:
+                size, exact = field._default.__class__.measure(buffer, start) #pylint: disable=protected-access
+                if not exact:
+                    return start - offset + size + cls._tails[idx + 1], False
+            else:
+                size = None if idx in cls._referenced else field.skip(buffer, start, packet, cls.big_endian)
+            if size is None:
+                try:
+                    values[idx], size = field.unpack_from(buffer, start, packet, cls.big_endian)
+                except struct.error:
+                    # The field falls short of the buffer, so it takes at least one more byte
+                    least = start - offset + cls._tails[idx]
+                    return max(least, len(buffer) - offset + 1), False
+            start += size
+        return start - offset, True
+
+    @classmethod
+    def unpack_many(cls, buffer, count=None, columns=False):
+        """
+        Decode consecutive packets from a buffer in a single call, either all
+        that fit in the buffer or exactly the given count. Without a count, an
+        incomplete packet at the end of the buffer is left out, while a count
+        the buffer falls short of raises struct.error. Returns a list of
+        packets, or a dictionary of per-field value lists with columns=True
+        """
+        if cls._struct is not None:
+            rows = cls._iter_struct(buffer, count)
+            if columns:
+                return cls._struct_columns(rows)
+            return [cls._from_struct(row) for row in rows]
+
+        packets = []
+        offset = 0
+        while len(packets) != count and (count is not None or offset < len(buffer)):
+            packet = cls._blank()
+            try:
+                size = packet.unpack_from(buffer, offset)
+            except struct.error:
+                if count is not None:
+                    raise
+                break
+            packets.append(packet)
+            offset += size
+            # Packets without a size would never exhaust the buffer
+            if size == 0 and count is None:
+                break
+
+        if columns:
+            return {name: [packet[name] for packet in packets] for name in cls._fnames}
+        return packets
+
+    @classmethod
+    def _iter_struct(cls, buffer, count=None):
+        """ Iterate the compiled struct values of consecutive packets """
+        size = cls._struct.size
+        view = memoryview(buffer)
+        if count is None:
+            # Packets without a size would never exhaust the buffer, so only one is decoded
+            count = len(view) // size if size else min(len(view), 1)
+        elif count * size > len(view):
+            raise struct.error('unpack_many requires a buffer of at least {} bytes'.format(count * size))
+
+        view = view[:count * size]
+        if hasattr(cls._struct, 'iter_unpack') and size:
+            return cls._struct.iter_unpack(view)
+        return (cls._struct.unpack_from(view, idx * size) for idx in range(count))
+
+    @classmethod
+    def _decode_struct(cls, row, values):
+        """ Store the values unpacked by the compiled struct """
+        for unpacked, value in zip(cls._unpacked, row):
+            if unpacked is not None:
+                idx, decode = unpacked
+                values[idx] = decode(value) if decode else value
+
+    @classmethod
+    def _from_struct(cls, row):
+        """ Create a new packet from the values unpacked by the compiled struct """
+        packet = cls._blank()
+        cls._decode_struct(row, packet._values) #pylint: disable=protected-access
+        return packet
+
+    @classmethod
+    def _struct_columns(cls, rows):
+        """ Transpose the compiled struct values of many packets into columns """
+        columns = {name: [] for name in cls._fnames}
+        for unpacked, column in zip(cls._unpacked, zip(*rows)):
+            if unpacked is not None:
+                idx, decode = unpacked
+                name = cls.fields[idx].name
+                columns[name] = [decode(x) for x in column] if decode else list(column)
+        return columns
+
+    @classmethod
+    def numpy_dtype(cls):
+        """
+        Fetch the numpy structured dtype equivalent to a fixed layout packet.
+        Padding is left out of the dtype fields, but kept in its item size
+        """
+        if numpy is None:
+            raise ImportError('numpy is required for numpy support')
+        if cls._struct is None:
+            raise TypeError('Only fixed layout packets have a numpy dtype')
+
+        endian = '>' if cls.big_endian else '<'
+        names, formats, offsets = [], [], []
+        for idx, fmt, offset in cls._layout:
+            field = cls.fields[idx]
+            if isinstance(field, fields.Padding):
+                continue
+            names.append(field.name)
+            formats.append(endian + NUMPY_TYPES.get(fmt, 'S' + fmt[:-1]))
+            offsets.append(offset)
+        return numpy.dtype({
+            'names': names,
+            'formats': formats,
+            'offsets': offsets,
+            'itemsize': cls._struct.size
+        })
+
+    @classmethod
+    def decode_array(cls, buffer, count=None, offset=0):
+        """
+        Decode consecutive fixed layout packets into a numpy structured array
+        viewing the buffer, without copying it
+        """
+        dtype = cls.numpy_dtype()
+        if count is None:
+            count = (len(memoryview(buffer)) - offset) // dtype.itemsize
+        return numpy.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+
+    @classmethod
+    def encode_array(cls, array):
+        """ Encode a numpy array with the packet field names into raw bytes """
+        dtype = cls.numpy_dtype()
+        fill = [(offset, bytearray(cls.fields[idx].default())[0])
+                for idx, fmt, offset in cls._layout
+                if fmt == 'c' and isinstance(cls.fields[idx], fields.Padding)]
+        if array.dtype == dtype and not fill:
+            return numpy.ascontiguousarray(array).tobytes()
+
+        encoded = numpy.zeros(len(array), dtype=dtype)
+        for name in dtype.names:
+            encoded[name] = array[name]
+
+        # Padding bytes that aren't null have to be written explicitly
+        raw = encoded.view(numpy.uint8).reshape(len(encoded), dtype.itemsize)
+        for offset, byte in fill:
+            raw[:, offset] = byte
+        return raw.tobytes()
+
+    def __deepcopy__(self, memo):
+        self._load_all()
+        packet = self._create(copy.deepcopy(self._values, memo))
+        # Instances of classes without slots may carry attributes of their own
+        if getattr(self, '__dict__', None):
+            packet.__dict__.update(copy.deepcopy(self.__dict__, memo))
+        return packet
+
+    def __getstate__(self):
+        self._load_all()
+        return self._values, getattr(self, '__dict__', None)
+
+    def __setstate__(self, state):
+        values, attributes = state
+        self._values = list(values)
+        if attributes:
+            self.__dict__.update(attributes)
+        self._size = None
+        self._lazy = None
+        self._source = None
+        self._dirty = None
+
     def __bytes__(self):
         return self.pack()
 
@@ -54,9 +443,8 @@ class BasePacket(object):
 
     def __repr__(self):
         msg = "<Packet: {}>\n".format(self.name)
-        for field in self.fields:
-            if not isinstance(field, fields.Padding):
-                msg += "  {}: {}\n".format(field.name, field.value)
+        for name, value in self.iteritems():
+            msg += "  {}: {}\n".format(name, value)
         msg = msg[:-1]
         return msg
 
@@ -74,8 +462,10 @@ class BasePacket(object):
         else:
             raise TypeError(key)
         # Return value
-        field = self.fields[idx]
-        return field.value
+        value = self._values[idx]
+        if value is PENDING:
+            value = self._load(idx)
+        return value
 
     def __setitem__(self, key, value):
         # Get field by index
@@ -90,12 +480,20 @@ class BasePacket(object):
         # Other accessors not supported
         else:
             raise TypeError(key)
-        # Set Value
+        # Set Value, decoding lazy fields first if their offsets could change
         field = self.fields[idx]
+        if idx in self._sizers:
+            self._load_all()
         try:
-            field.set(value)
+            self._values[idx] = field.prepare(value, self)
         except Exception as error:
             raise TypeError('Bad value: {}'.format(str(error)))
+        if idx in self._sizers:
+            self._size = None
+        if self._source is not None:
+            if self._dirty is None:
+                self._dirty = set()
+            self._dirty.add(idx)
 
     def __iter__(self):
         return self.values().__iter__()
@@ -115,85 +513,299 @@ class BasePacket(object):
         return NotImplemented
 
     def pack(self):
-        """ Fetch the packed raw byte string of the packet """
-        raw = b''
-        for field in self.fields:
-            raw += field.pack(big_endian=self.big_endian)
-        return raw
+        """
+        Fetch the packed raw byte string of the packet. Packets unpacked from
+        bytes reuse them, only re-encoding the fields modified since
+        """
+        patches = self._patches()
+        if patches is not None:
+            source, offsets = self._source
+            start, end = offsets[0], offsets[-1]
+            if not patches:
+                if start == 0 and end == len(source):
+                    return source
+                return source[start:end]
+            raw = bytearray(source[start:end])
+            self._patch(raw, -start, patches)
+            return bytes(raw)
+
+        if self._struct is not None:
+            return self._struct.pack(*self._struct_values())
+        raw = bytearray(self.size())
+        self.pack_into(raw)
+        return bytes(raw)
+
+    def pack_into(self, buffer, offset=0):
+        """
+        Pack the packet directly into a writable buffer (bytearray, memoryview,
+        mmap...) at the given offset, returning the number of bytes written
+        """
+        patches = self._patches()
+        if patches is not None:
+            source, offsets = self._source
+            start, end = offsets[0], offsets[-1]
+            if len(buffer) - offset < end - start:
+                raise struct.error('pack_into requires a buffer of at least {} bytes'.format(
+                    offset + end - start))
+            buffer[offset:offset + end - start] = memoryview(source)[start:end]
+            self._patch(buffer, offset - start, patches)
+            return end - start
+
+        if self._struct is not None:
+            self._struct.pack_into(buffer, offset, *self._struct_values())
+            return self._struct.size
+
+        self._load_all()
+        return self._generated()[0](self, self._values, buffer, offset)
+
+    def _patches(self):
+        """
+        Fetch the indexes of the fields to re-encode over the bytes the packet
+        was unpacked from, or None if it has to be packed from scratch
+        """
+        if self._source is None:
+            return None
+        dirty = self._dirty or ()
+        if self._struct is not None:
+            if dirty or any(self.fields[idx].modified(self._values[idx]) for idx in self._fresh):
+                return None
+            return []
+
+        # Fields sized by another field keep their value when it's set, so
+        #  they can't be patched without moving every field after them
+        if self._referenced.intersection(dirty):
+            return None
 
-    def unpack(self, raw, partial=False):
+        # Mutable values can be modified in place, so they're checked as well
+        offsets = self._source[1]
+        patches = []
+        for idx in set(self._fresh).union(dirty):
+            value = self._values[idx]
+            if value is PENDING:
+                continue
+            field = self.fields[idx]
+            if idx in dirty or field.modified(value):
+                # Fields that changed size move every field after them
+                if field.size(value, self) != offsets[idx + 1] - offsets[idx]:
+                    return None
+                patches.append(idx)
+        return patches
+
+    def _patch(self, buffer, shift, patches):
+        """ Re-encode the given fields over a copy of the packet's bytes """
+        offsets = self._source[1]
+        for idx in patches:
+            self.fields[idx].pack_into(self._values[idx], buffer, offsets[idx] + shift, self,
+                                       self.big_endian)
+
+    def modified(self):
+        """ Check if the packet differs from the bytes it was unpacked from """
+        return self._patches() != []
+
+    def _struct_values(self):
+        """ Fetch the values of the compiled struct, ready for packing """
+        values = self._values
+        return [encode(values[idx]) if encode else values[idx] for idx, encode in self._packed]
+
+    def unpack(self, raw, partial=False, retain=False):
         """ Unpack a raw byte string into this packets fields """
-        start = 0
-        for field in self.fields:
-            part = raw[start:]
+        self.unpack_from(raw, 0, partial, retain=retain)
+
+    def unpack_from(self, buffer, offset=0, partial=False, lazy=False, retain=False):
+        """
+        Unpack this packets fields from any buffer (bytes, bytearray,
+        memoryview, mmap...) starting at the given offset, without copying it.
+        Returns the number of bytes consumed.
+
+        Lazy unpacking only records where each field is in the buffer, and
+        decodes it when it's first accessed; The buffer must not be modified
+        until then. Fixed layout packets are always decoded in full, as it
+        takes a single struct call.
+
+        Retaining packets unpacked in full from bytes hold on to them, so
+        packing them again only has to re-encode the fields that were modified.
+        """
+        values = self._values
+        self._lazy = None
+        self._source = None
+        self._dirty = None
+        # Only immutable bytes are safe to hold on to
+        retain = retain and not partial and isinstance(buffer, bytes)
+        if self._struct is not None and not (partial and len(buffer) - offset < self._struct.size):
+            self._decode_struct(self._struct.unpack_from(buffer, offset), values)
+            if retain:
+                self._retain(buffer, [offset, offset + self._struct.size])
+            return self._struct.size
+        if lazy and self._struct is None:
+            return self._unpack_lazy(buffer, offset, partial, retain)
+        if not partial:
+            offsets = self._generated()[1](self, values, buffer, offset, retain)
+            self._size = None
+            if retain:
+                self._retain(buffer, offsets)
+            return offsets[-1] - offset
+
+        start = offset
+        for idx, field in enumerate(self.fields):
             # Stop early when the the raw data falls short of unpacking the field
-            if partial and len(part) < field.size():
+            if partial and len(buffer) - start < field.size(values[idx], self):
                 break
-            field.unpack(part, big_endian=self.big_endian)
-            start += field.size()
+            values[idx], size = field.unpack_from(buffer, start, self, self.big_endian)
+            start += size
+        self._size = None
+        return start - offset
+
+    def _retain(self, buffer, offsets):
+        """
+        Hold on to the bytes the packet was unpacked from, given the offsets
+        of its fields and its end, or just its start and end for fixed layouts
+        """
+        self._source = (buffer, offsets)
+
+    def _unpack_lazy(self, buffer, offset, partial, retain):
+        """ Record the offsets of the fields in the buffer, without decoding them """
+        values = self._values
+        offsets = [None] * (len(values) + 1)
+        self._lazy = (buffer, offsets)
+
+        start = offset
+        for idx, field in enumerate(self.fields):
+            offsets[idx] = start
+            # Fields which can't be skipped are decoded right away
+            size = field.skip(buffer, start, self, self.big_endian)
+            if size is None:
+                if partial and len(buffer) - start < field.size(values[idx], self):
+                    break
+                values[idx], size = self._unpack_field(idx, buffer, start, retain)
+            else:
+                # Stop early when the the raw data falls short of the field
+                if len(buffer) - start < size:
+                    if partial:
+                        break
+                    raise struct.error('unpack_from requires a buffer of at least {} bytes'.format(
+                        start + size))
+                values[idx] = PENDING
+            start += size
+            offsets[idx + 1] = start
+        self._size = None
+        if retain:
+            self._retain(buffer, offsets)
+        return start - offset
+
+    def _unpack_field(self, idx, buffer, offset, retain=False):
+        """ Unpack a field value, having sub-packets retain their bytes along with the packet """
+        field = self.fields[idx]
+        if retain and isinstance(field, fields.Packet):
+            return field.unpack_from(buffer, offset, self, self.big_endian, retain)
+        return field.unpack_from(buffer, offset, self, self.big_endian)
+
+    def _load(self, idx):
+        """ Decode a lazily unpacked field value """
+        buffer, offsets = self._lazy
+        value, _ = self._unpack_field(idx, buffer, offsets[idx], self._source is not None)
+        self._values[idx] = value
+        return value
+
+    def _load_all(self):
+        """ Decode every lazily unpacked field value left """
+        if self._lazy is None:
+            return
+        for idx, value in enumerate(self._values):
+            if value is PENDING:
+                self._load(idx)
+        self._lazy = None
+
+    def _value(self, idx):
+        """ Fetch a field value, decoding it if needed """
+        value = self._values[idx]
+        if value is PENDING:
+            value = self._load(idx)
+        return value
 
     def clear(self):
         """ Clear all field values to their defaults """
-        for field in self.fields:
-            field.reset()
+        self._values = self._new_values()
+        self._size = None
+        self._lazy = None
+        self._source = None
+        self._dirty = None
 
     def size(self):
         """ Calculate the packet size """
-        result = 0
-        for field in self.fields:
-            result += field.size()
-        return result
-
-    def hex_dump(self):
-        """ Print a human readable hex dump of the packet data """
-        raw = self.pack()
-        dump = ''
-        for idx, byte in enumerate(bytearray(raw)):
-            # Prepend the line with an address
-            if (idx % 16) == 0:
-                dump += "{:04x}".format(idx)
-            # Visual pleasing space in the middle of 16 bytes
-            elif (idx % 8) == 0:
-                dump += ' '
-            # Add bytes
-            dump += " {:02x}".format(byte)
-            # End with a new line if we're not finished
-            if (idx % 16) == 15 and idx != len(raw)-1:
-                dump += '\n'
-        return dump
+        if self._static_size is not None:
+            return self._static_size
+
+        # Lazy fields not decoded yet keep the size they had in the buffer
+        if self._lazy is not None:
+            offsets = self._lazy[1]
+            size = 0
+            for idx, field in enumerate(self.fields):
+                value = self._values[idx]
+                if value is PENDING:
+                    size += offsets[idx + 1] - offsets[idx]
+                else:
+                    size += field.size(value, self)
+            return size
+
+        # Cached sizes are only recalculated after they've been invalidated
+        size = self._size
+        if size is None:
+            size = self._fixed_size
+            for idx in self._cached:
+                size += self.fields[idx].size(self._values[idx], self)
+            self._size = size
+
+        for idx in self._volatile:
+            size += self.fields[idx].size(self._values[idx], self)
+        return size
+
+    def hex_dump(self, annotate=False):
+        """
+        Print a human readable hex dump of the packet data, optionally listing
+        the fields starting on each line
+        """
+        return '\n'.join(self.iter_hex_dump(annotate))
+
+    def iter_hex_dump(self, annotate=False):
+        """ Iterate the lines of a human readable hex dump of the packet data """
+        return iter_hex_dump(self.pack(), self._annotations() if annotate else None)
+
+    def _annotations(self):
+        """ Fetch the offset and name of every field """
+        annotations = []
+        start = 0
+        for idx, field in enumerate(self.fields):
+            if not isinstance(field, fields.Padding):
+                annotations.append((start, field.name))
+            start += field.size(self._value(idx), self)
+        return annotations
 
     def keys(self):
         """ Fetch a list of the field names """
-        return [x.name for x in self.fields if not isinstance(x, fields.Padding)]
+        return [field.name for _, field in self._keyed]
 
     def values(self):
         """ Fetch a list of the field values """
-        return [x.value for x in self.fields if not isinstance(x, fields.Padding)]
+        return [self._value(idx) for idx, _ in self._keyed]
 
     def items(self):
         """ Fetch a list of field name value pairs """
-        return [(x.name, x.value) for x in self.fields if not isinstance(x, fields.Padding)]
+        return [(field.name, self._value(idx)) for idx, field in self._keyed]
 
     def iterkeys(self):
         """ Fetch a field name iterator """
-        for field in self.fields:
-            if isinstance(field, fields.Padding):
-                continue
+        for _, field in self._keyed:
             yield field.name
 
     def itervalues(self):
         """ Fetch a field value iterator """
-        for field in self.fields:
-            if isinstance(field, fields.Padding):
-                continue
-            yield field.value
+        for idx, _ in self._keyed:
+            yield self._value(idx)
 
     def iteritems(self):
         """ Fetch a field name, value pair iterator """
-        for field in self.fields:
-            if isinstance(field, fields.Padding):
-                continue
-            yield (field.name, field.value)
+        for idx, field in self._keyed:
+            yield (field.name, self._value(idx))
 
     def dict(self):
         """ Fetch the packet as an ordered dictionary """
@@ -201,8 +813,199 @@ class BasePacket(object):
 
 class BigEndian(BasePacket):
     """ Big Endian Packet Class """
+    __slots__ = ()
     big_endian = True
 
 class LittleEndian(BasePacket):
     """ Little Endian Packet Class """
+    __slots__ = ()
     big_endian = False
+
+class Union(object):
+    """
+    Packet union
+    Decodes packets into one of many packet classes, selected by the value of
+    a discriminator field at the same offset in all of them, such as the type
+    field of a common header. The discriminator is read on its own, and only
+    the packet class it selects is decoded
+    """
+    def __init__(self, header, name, classes=None, default=None):
+        idx = header._fnames[name] #pylint: disable=protected-access
+        field = header.fields[idx]
+        if idx >= len(header._offsets) or field.fmt() is None: #pylint: disable=protected-access
+            raise ValueError('The discriminator {} must be a fixed size field at a fixed offset'.format(name))
+        # Mutable values, such as bit fields, can't select a class from a dictionary
+        if field.mutable:
+            raise ValueError('The discriminator {} must hold immutable values'.format(name))
+
+        self.header = header
+        self.name = name
+        self.default = default
+        self._offset = header._offsets[idx] #pylint: disable=protected-access
+        self._struct = struct.Struct(('>' if header.big_endian else '<') + field.fmt())
+        self._decode = field._decode if _overrides(field, '_decode') else None #pylint: disable=protected-access
+        self._classes = {}
+        for value, packet_cls in six.iteritems(classes or {}):
+            self.register(value, packet_cls)
+
+    def __reduce__(self):
+        # Compiled structs can't be pickled, so unions are created again instead
+        return Union, (self.header, self.name, self._classes, self.default)
+
+    def register(self, value, packet_cls=None):
+        """
+        Register the packet class selected by a discriminator value. Without a
+        packet class, returns a decorator registering the class it decorates
+        """
+        if packet_cls is None:
+            def decorator(packet_cls):
+                """ Register the decorated packet class """
+                return self.register(value, packet_cls)
+            return decorator
+
+        self._classes[value] = packet_cls
+        return packet_cls
+
+    def discriminator(self, buffer, offset=0):
+        """ Read the discriminator value of the packet at the offset of a buffer """
+        value = self._struct.unpack_from(buffer, offset + self._offset)[0]
+        return self._decode(value) if self._decode else value
+
+    def select(self, buffer, offset=0):
+        """ Fetch the packet class of the packet at the offset of a buffer """
+        value = self.discriminator(buffer, offset)
+        packet_cls = self._classes.get(value, self.default)
+        if packet_cls is None:
+            raise ValueError('No packet class is registered for {} {}'.format(self.name, value))
+        return packet_cls
+
+    def measure(self, buffer, offset=0):
+        """ Measure the packet at the offset of a buffer, like its packet class would """
+        least = self._offset + self._struct.size
+        if len(buffer) - offset < least:
+            return least, False
+        return self.select(buffer, offset).measure(buffer, offset)
+
+    def frame_size(self, buffer, offset=0):
+        """ Fetch the size of the packet at the offset of a buffer, like its packet class would """
+        size, exact = self.measure(buffer, offset)
+        return size if exact else None
+
+    def unpack_from(self, buffer, offset=0, partial=False, lazy=False, retain=False):
+        """ Decode the packet at the offset of a buffer, returning it and its size """
+        packet = self.select(buffer, offset)._blank() #pylint: disable=protected-access
+        size = packet.unpack_from(buffer, offset, partial, lazy, retain)
+        return packet, size
+
+    def from_raw(self, packed, partial=False, lazy=False, retain=False):
+        """ Decode a packet from the raw bytes (or any buffer) """
+        return self.unpack_from(packed, 0, partial, lazy, retain)[0]
+
+# Statistics of the packet operations of each packet class, only gathered
+#  while enabled, by swapping timed packet methods in for the original ones
+_STATS = {}
+_ORIGINALS = {}
+_LOCAL = threading.local()
+_CALLBACK = [None]
+_CLOCK = getattr(time, 'perf_counter', time.time)
+
+def _record(packet_cls, operation, size, elapsed):
+    """ Record a packet operation, and pass it to the callback """
+    counters = _STATS.setdefault(packet_cls, {}).setdefault(operation, [0, 0, 0.0])
+    counters[0] += 1
+    counters[1] += size
+    counters[2] += elapsed
+    if _CALLBACK[0] is not None:
+        _CALLBACK[0](packet_cls, operation, size, elapsed)
+
+def _timed_init(self, *args, **kwargs):
+    """ Construct a packet, recording the time it takes unless it's decoded into """
+    if getattr(_LOCAL, 'decoding', False):
+        _ORIGINALS['__init__'](self, *args, **kwargs)
+        return
+    start = _CLOCK()
+    _ORIGINALS['__init__'](self, *args, **kwargs)
+    _record(type(self), 'construct', 0, _CLOCK() - start)
+
+def _timed_blank(cls):
+    """ Create a packet to decode into, which isn't recorded as a construction """
+    decoding = getattr(_LOCAL, 'decoding', False)
+    _LOCAL.decoding = True
+    try:
+        return _ORIGINALS['_blank'].__func__(cls)
+    finally:
+        _LOCAL.decoding = decoding
+
+def _timed_pack(self):
+    """ Pack a packet, recording the time it takes and its size """
+    start = _CLOCK()
+    # Packing into a buffer is part of packing this same packet
+    packing = getattr(_LOCAL, 'packing', None)
+    _LOCAL.packing = self
+    try:
+        raw = _ORIGINALS['pack'](self)
+    finally:
+        _LOCAL.packing = packing
+    _record(type(self), 'pack', len(raw), _CLOCK() - start)
+    return raw
+
+def _timed_pack_into(self, buffer, offset=0):
+    """ Pack a packet into a buffer, recording the time it takes and its size """
+    if getattr(_LOCAL, 'packing', None) is self:
+        return _ORIGINALS['pack_into'](self, buffer, offset)
+    start = _CLOCK()
+    size = _ORIGINALS['pack_into'](self, buffer, offset)
+    _record(type(self), 'pack', size, _CLOCK() - start)
+    return size
+
+def _timed_unpack_from(self, buffer, offset=0, partial=False, lazy=False, retain=False):
+    """ Unpack a packet, recording the time it takes and its size """
+    start = _CLOCK()
+    size = _ORIGINALS['unpack_from'](self, buffer, offset, partial, lazy, retain)
+    _record(type(self), 'unpack', size, _CLOCK() - start)
+    return size
+
+_TIMED = {
+    '__init__': _timed_init,
+    '_blank': classmethod(_timed_blank),
+    'pack': _timed_pack,
+    'pack_into': _timed_pack_into,
+    'unpack_from': _timed_unpack_from,
+}
+
+def enable_stats(callback=None):
+    """
+    Start recording the count, bytes and time of the constructions, packs and
+    unpacks of each packet class. The callback, if any, is called with the
+    packet class, operation, bytes and seconds of each of them. Fixed layout
+    packets decoded in bulk by unpack_many() or numpy aren't recorded
+    """
+    _CALLBACK[0] = callback
+    if not _ORIGINALS:
+        for name, timed in six.iteritems(_TIMED):
+            _ORIGINALS[name] = BasePacket.__dict__[name]
+            setattr(BasePacket, name, timed)
+
+def disable_stats():
+    """ Stop recording statistics, restoring the untimed packet methods """
+    _CALLBACK[0] = None
+    for name, original in six.iteritems(_ORIGINALS):
+        setattr(BasePacket, name, original)
+    _ORIGINALS.clear()
+
+def reset_stats():
+    """ Forget the statistics recorded so far """
+    _STATS.clear()
+
+def stats():
+    """
+    Fetch a snapshot of the statistics recorded, by packet class name and
+    operation ('construct', 'pack' or 'unpack')
+    """
+    return {
+        '{}.{}'.format(packet_cls.__module__, packet_cls.__name__): {
+            operation: {'count': count, 'bytes': size, 'seconds': elapsed}
+            for operation, (count, size, elapsed) in six.iteritems(operations)
+        }
+        for packet_cls, operations in list(_STATS.items())
+    }
@@ -0,0 +1,49 @@
+""" Stream classes - Reassemble packets from streams of bytes """
+from __future__ import unicode_literals
+
+class Framer(object):
+    """
+    Packet framer
+    Reassembles packets from a byte stream, such as a TCP socket, which can
+    deliver them in arbitrary chunks. Chunks are appended to a single buffer,
+    and the bytes of the packets taken from it are only removed once per chunk.
+    Packets are either of a single packet class, or of any class of a union
+    """
+    def __init__(self, packet_cls):
+        self.packet_cls = packet_cls
+        self._buffer = bytearray()
+        self._start = 0
+
+    def __len__(self):
+        """ Fetch the number of bytes buffered that aren't part of a packet yet """
+        return len(self._buffer) - self._start
+
+    def feed(self, data):
+        """
+        Add a chunk of the stream, returning an iterator of the packets that
+        are complete. Any packets not iterated are returned by the next call
+        """
+        # Drop the bytes of the packets taken since the previous chunk
+        if self._start:
+            del self._buffer[:self._start]
+            self._start = 0
+        self._buffer += data
+        return self._packets()
+
+    def _packets(self):
+        """ Iterate the complete packets in the buffer """
+        while True:
+            size = self.packet_cls.frame_size(self._buffer, self._start)
+            if size is None or len(self._buffer) - self._start < size:
+                return
+            if size == 0:
+                raise ValueError("Packets without a size can't be framed")
+
+            packet = self.packet_cls.from_raw(memoryview(self._buffer)[self._start:self._start + size])
+            self._start += size
+            yield packet
+
+    def clear(self):
+        """ Drop all the bytes buffered """
+        self._buffer = bytearray()
+        self._start = 0
@@ -0,0 +1,100 @@
+""" Testing the asyncio stream helpers """
+#pylint: disable=C0326,W0621
+from __future__ import unicode_literals
+import asyncio
+import struct
+import pytest #pylint: disable=unused-import
+from packeteer import packets, fields
+from packeteer import aio
+
+# Packet classes
+class SubPacket(packets.BigEndian):
+    """ Sub-packet (Big Endian) """
+    fields = [
+        fields.UInt8('size'),
+        fields.Raw('raw', size='size'),
+    ]
+
+class Packet(packets.BigEndian):
+    """ Streamed packet (Big Endian) """
+    fields = [
+        fields.UInt8('type'),
+        fields.Packet('sub', default=SubPacket()),
+        fields.UInt16('count'),
+        fields.List('list', fields.UInt16(), size='count'),
+    ]
+
+class Writer(object):
+    """ StreamWriter recording what's written """
+    def __init__(self):
+        self.written = []
+
+    def write(self, data):
+        """ Record written data """
+        self.written.append(data)
+
+    async def drain(self):
+        """ Nothing to drain """
+
+def run(coroutine):
+    """ Run a coroutine to completion """
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+def gen_packets():
+    """ Generate packets of different sizes """
+    return [Packet(type=x, sub=SubPacket(raw=b'r' * x), list=list(range(x))) for x in range(4)]
+
+### TESTS ###
+def test_read_packet():
+    """ Test reading packets reads exactly their bytes """
+    expected = gen_packets()
+    raw = b''.join(x.pack() for x in expected)
+
+    async def read_all():
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw + b'\xff')
+        reader.feed_eof()
+        packets_ = []
+        for _ in expected:
+            packets_.append(await aio.read_packet(reader, Packet))
+        with pytest.raises(asyncio.IncompleteReadError):
+            await aio.read_packet(reader, Packet)
+        return packets_
+    assert run(read_all()) == expected
+
+def test_write_packets():
+    """ Test packets are written at once """
+    writer = Writer()
+    run(aio.write_packets(writer, gen_packets()))
+    assert writer.written == [b''.join(x.pack() for x in gen_packets())]
+
+def test_protocol():
+    """ Test the protocol reassembles the packets received """
+    class Protocol(aio.PacketProtocol):
+        """ Protocol recording the packets received """
+        packet_cls = Packet
+        received = []
+
+        def packet_received(self, packet):
+            self.received.append(packet)
+
+    protocol = Protocol()
+    protocol.connection_made(Writer())
+    raw = b''.join(x.pack() for x in gen_packets())
+    for idx in range(0, len(raw), 5):
+        protocol.data_received(raw[idx:idx + 5])
+    assert protocol.received == gen_packets()
+
+    protocol.send_packets(*gen_packets()[:2])
+    assert protocol.transport.written == [raw[:struct.calcsize('>BBH') * 2 + 3]]
+
+def test_protocol_default():
+    """ Test packets received are ignored unless the protocol handles them """
+    protocol = aio.PacketProtocol(Packet)
+    protocol.connection_made(Writer())
+    protocol.data_received(gen_packets()[1].pack())
+    assert len(protocol._framer) == 0 #pylint: disable=protected-access
@@ -0,0 +1,64 @@
+""" Testing the generated pack and unpack functions of dynamic packets """
+#pylint: disable=C0326,W0621,protected-access
+from __future__ import unicode_literals
+import struct
+import pytest #pylint: disable=unused-import
+from packeteer import packets, fields
+
+# Packet classes
+class SubPacket(packets.LittleEndian):
+    """ Sub-packet (Little Endian) """
+    fields = [
+        fields.UInt8('size'),
+        fields.Raw('raw', size='size'),
+    ]
+
+class Packet(packets.LittleEndian):
+    """ Mixed layout packet (Little Endian) """
+    fields = [
+        fields.UInt16('id'),
+        fields.Padding(default=b'\xff'),
+        fields.UInt8('length'),
+        fields.String('name', size='length'),
+        fields.Int32('value'),
+        fields.Padding(),
+        fields.Packet('sub', default=SubPacket()),
+        fields.UInt8('count'),
+        fields.List('list', fields.UInt16(), size='count'),
+    ]
+
+RAW = (struct.pack('<HBB5sixB', 7, 0xff, 5, b'Hello', -3, 2) + b'ab' +
+       struct.pack('<BHH', 2, 1, 2))
+
+### TESTS ###
+def test_generated_source():
+    """ Test fixed fields are grouped into single structs """
+    source = Packet.generated_source()
+    assert 's0.pack_into(buffer, p0, values[0], e1(values[1]), values[2])' in source
+    assert 'values[0], _, values[2] = s0.unpack_from(buffer, p0)' in source
+    assert 'n = int(values[2])' in source
+    assert "pack_bytes(str(n) + 's', buffer, p3, e3(values[3]))" in source
+    assert 'f3.pack_into' not in source
+    assert 'f6.unpack_from(buffer, p6, self, big_endian, retain)' in source
+    assert Packet._code is None or Packet._code is Packet._generated()
+
+@pytest.mark.parametrize('buffer_type', [bytes, bytearray, memoryview])
+def test_generated_unpack(buffer_type):
+    """ Test the generated functions unpack and pack like the fields would """
+    packet = Packet()
+    assert packet.unpack_from(buffer_type(b'\x00' + RAW), 1) == len(RAW)
+    assert packet['name'] == 'Hello'
+    assert packet['value'] == -3
+    assert packet['sub']['raw'] == b'ab'
+    assert packet['list'] == [1, 2]
+    assert packet.pack() == RAW
+    assert Packet(id=7, name='Hello', value=-3, sub=SubPacket(raw=b'ab'), list=[1, 2]).pack() == RAW
+
+    # Sized values are padded or truncated to the size they're given
+    packet['length'] = 7
+    assert packet.pack()[3:11] == b'\x07Hello\x00\x00'
+    packet['sub']['size'] = 1
+    assert packet['sub'].pack() == b'\x01a'
+
+    with pytest.raises(struct.error):
+        Packet().unpack_from(buffer_type(RAW[:8]))
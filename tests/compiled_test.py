@@ -0,0 +1,46 @@
+""" Testing the compiled struct layout of fixed size packets """
+#pylint: disable=C0326,W0621,protected-access
+from __future__ import unicode_literals
+import struct
+import pytest #pylint: disable=unused-import
+from packeteer import packets, fields
+
+# Packet classes
+class FixedPacket(packets.LittleEndian):
+    """ Fixed layout packet (Little Endian) """
+    fields = [
+        fields.UInt8('uint8'),
+        fields.Padding(),
+        fields.Int16('int16'),
+        fields.Padding(default=b'\xff'),
+        fields.Double('double'),
+        fields.Raw('raw', size=4),
+        fields.String('string', size=8),
+    ]
+
+class DynamicPacket(packets.BigEndian):
+    """ Dynamic layout packet (Big Endian) """
+    fields = [
+        fields.UInt8('size'),
+        fields.Raw('raw', size='size'),
+    ]
+
+### TESTS ###
+def test_compiled_layout():
+    """ Test only fixed layouts get a compiled struct """
+    assert FixedPacket._struct.format in ('<Bxhcd4s8s', b'<Bxhcd4s8s')
+    assert FixedPacket._struct.size == FixedPacket().size()
+    assert DynamicPacket._struct is None
+    assert packets.BigEndian._struct is not None
+    assert packets.BasePacket._struct is None
+
+def test_compiled_pack_unpack():
+    """ Test packing and unpacking through the compiled struct """
+    packet = FixedPacket(uint8=1, int16=-2, double=2.5, raw=b'ab', string='Hi')
+    raw = struct.pack('<BxhBd4s8s', 1, -2, 0xff, 2.5, b'ab', b'Hi')
+    assert packet.pack() == raw
+
+    unpacked = FixedPacket.from_raw(raw + b'trailing')
+    assert unpacked == packet
+    assert unpacked['raw'] == b'ab\x00\x00'
+    assert unpacked['string'] == 'Hi'
@@ -0,0 +1,7 @@
+""" Test collection settings """
+import sys
+
+# The asyncio tests use syntax that older Pythons can't even parse
+collect_ignore = []
+if sys.version_info < (3, 5):
+    collect_ignore.append('aio_test.py')
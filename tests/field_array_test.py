@@ -0,0 +1,52 @@
+""" Testing array backed list field packet classes """
+#pylint: disable=C0326,W0621
+from __future__ import unicode_literals
+import array
+import struct
+import pytest #pylint: disable=unused-import
+from packeteer import packets, fields
+
+# Packet classes
+class DynamicPacketBE(packets.BigEndian):
+    """ Dynamically sized array packet (Big Endian) """
+    fields = [
+        fields.UInt32('count'),
+        fields.List('samples', fields.Int16(), size='count', array=True),
+        fields.List('floats', fields.Double(), size=2, array=True),
+    ]
+
+class DynamicPacketLE(packets.LittleEndian):
+    """ Dynamically sized array packet (Little Endian) """
+    fields = DynamicPacketBE.fields
+
+### TESTS ###
+@pytest.mark.parametrize('packet_cls,endian', [(DynamicPacketBE, '>'), (DynamicPacketLE, '<')])
+def test_array_list(packet_cls, endian):
+    """ Test packing and unpacking array backed lists """
+    data = [x - 50000 for x in range(100000)]
+    data = [x % 32768 for x in data]
+    packet1 = packet_cls(samples=data, floats=[1.5])
+    assert isinstance(packet1['samples'], array.array)
+    assert packet1['count'] == len(data)
+    assert packet1['floats'] == array.array('d', [1.5, 0.0])
+
+    raw1 = packet1.pack()
+    fmt  = '{}I{}h2d'.format(endian, len(data))
+    assert raw1 == struct.pack(fmt, len(data), *(data + [1.5, 0.0]))
+
+    packet2 = packet_cls.from_raw(raw1)
+    assert packet2['samples'] == array.array('h', data)
+    assert packet2 == packet1
+
+def test_array_values():
+    """ Test arrays are validated, and used directly when they match """
+    samples = array.array('h', [1, 2, 3])
+    packet = DynamicPacketBE(samples=samples)
+    assert packet['samples'] is samples
+
+    packet['count'] = 2
+    assert packet.pack()[4:8] == struct.pack('>hh', 1, 2)
+    with pytest.raises(TypeError):
+        packet['samples'] = [70000]
+    with pytest.raises(ValueError):
+        fields.List('chars', fields.Char(), array=True)
@@ -0,0 +1,105 @@
+""" Testing bit fields packed into integer words """
+#pylint: disable=C0326,W0621
+from __future__ import unicode_literals
+import copy
+import pickle
+import struct
+import pytest #pylint: disable=unused-import
+from packeteer import packets, fields
+
+# Packet classes
+class FixedPacket(packets.BigEndian):
+    """ Fixed bit field packet (Big Endian) """
+    fields = [
+        fields.BitStruct('header', [
+            fields.Bits('version', 4, default=4),
+            fields.Bits('length', 4, default=5),
+        ]),
+        fields.BitStruct('flags', [
+            fields.Bits('fragment', 1),
+            fields.Bits('offset', 13),
+        ], word=fields.UInt16()),
+    ]
+
+class DynamicPacket(packets.LittleEndian):
+    """ Dynamic bit field packet (Little Endian) """
+    fields = [
+        fields.BitStruct('header', [
+            fields.Bits('kind', 3),
+            fields.Bits('size', 9),
+        ]),
+        fields.Raw('raw', size=2),
+        fields.List('list', fields.UInt8(), size=2),
+    ]
+
+### TESTS ###
+def test_bits_layout():
+    """ Test bits are laid out from the most significant bit of the word """
+    packet = FixedPacket(flags={'fragment': 1, 'offset': 100})
+    assert packet['header'] == {'version': 4, 'length': 5}
+    assert packet.pack() == struct.pack('>BH', 0x45, 0x8000 | 100 << 2)
+    assert FixedPacket._struct.format in ('>BH', b'>BH') #pylint: disable=protected-access
+    assert DynamicPacket.fields[0].type == 'H'
+
+def test_bits_unpack():
+    """ Test bits are decoded from a single word """
+    packet = FixedPacket.from_raw(struct.pack('>BH', 0x46, 0x8000 | 3 << 2))
+    assert packet['header']['length'] == 6
+    assert packet['flags']['fragment'] == 1
+    assert packet['flags']['offset'] == 3
+    assert packet['flags'].items() == [('fragment', 1), ('offset', 3)]
+
+    raw = struct.pack('<H', 5 << 13 | 300 << 4) + b'ab\x01\x02'
+    packet = DynamicPacket.from_raw(raw)
+    assert packet['header'] == {'kind': 5, 'size': 300}
+    assert packet.pack() == raw
+    assert DynamicPacket.unpack_many(raw * 2, columns=True)['header'][1]['size'] == 300
+
+def test_bits_set():
+    """ Test setting bits validates them against their size """
+    packet = FixedPacket()
+    packet['flags']['offset'] = 2 ** 13 - 1
+    with pytest.raises(struct.error):
+        packet['flags']['offset'] = 2 ** 13
+    with pytest.raises(struct.error):
+        packet['header']['version'] = -1
+    with pytest.raises(KeyError):
+        packet['header']['foo'] = 1
+
+    packet['header'] = 0x12
+    assert packet['header'] == {'version': 1, 'length': 2}
+    packet['header'] = {'length': 1}
+    assert packet['header'] == {'version': 4, 'length': 1}
+    with pytest.raises(TypeError):
+        packet['header'] = 256
+
+def test_bits_passthrough():
+    """ Test bits modified in place are re-encoded """
+    raw = struct.pack('>BH', 0x45, 0)
+    packet = FixedPacket.from_raw(raw, retain=True)
+    assert not packet.modified()
+    packet['flags']['fragment'] = 1
+    assert packet.modified()
+    assert packet.pack() == struct.pack('>BH', 0x45, 0x8000)
+
+    raw = struct.pack('<H', 0) + b'ab\x01\x02'
+    packet = DynamicPacket.from_raw(raw, retain=True)
+    packet['header']['kind'] = 7
+    assert packet.pack() == struct.pack('<H', 7 << 13) + b'ab\x01\x02'
+
+def test_bits_instances():
+    """ Test bit values aren't shared between packets """
+    packet1 = FixedPacket()
+    packet2 = copy.deepcopy(packet1)
+    packet1['header']['version'] = 6
+    assert packet2['header']['version'] == 4
+    assert pickle.loads(pickle.dumps(packet1, protocol=2)) == packet1
+
+def test_bits_errors():
+    """ Test bits have to fit in the word of their bit struct """
+    with pytest.raises(ValueError):
+        fields.BitStruct('word', [fields.Bits('bits', 9)], word=fields.UInt8())
+    with pytest.raises(ValueError):
+        fields.BitStruct('word', [fields.Bits('bits', 65)])
+    with pytest.raises(ValueError):
+        fields.BitStruct('word', [fields.Bits('bits', 2, default=4)])
@@ -0,0 +1,90 @@
+""" Testing length prefixed and terminated raw data and strings """
+#pylint: disable=C0326,W0621
+from __future__ import unicode_literals
+import struct
+import pytest #pylint: disable=unused-import
+from packeteer import packets, fields
+
+# Packet classes
+class DelimitedPacket(packets.LittleEndian):
+    """ Delimited data packet (Little Endian) """
+    fields = [
+        fields.String('host', prefix=fields.UInt8()),
+        fields.Raw('blob', prefix=fields.UInt16()),
+        fields.String('message', prefix=fields.VarInt()),
+        fields.String('tag', terminator=b'\x00'),
+        fields.Raw('line', terminator=b'\r\n'),
+        fields.UInt16('end'),
+    ]
+
+VALUES = {'host': 'h\xe9', 'blob': b'\x00\x01', 'message': 'm' * 200, 'tag': 'ok',
+          'line': b'a\rb', 'end': 7}
+RAW = (b'\x03h\xc3\xa9' + struct.pack('<H', 2) + b'\x00\x01' + b'\xc8\x01' + b'm' * 200 +
+       b'ok\x00' + b'a\rb\r\n' + struct.pack('<H', 7))
+
+### TESTS ###
+def test_delimited_pack():
+    """ Test delimited values pack along with their prefix or terminator """
+    packet = DelimitedPacket(**VALUES)
+    assert packet.size() == len(RAW)
+    assert packet.pack() == RAW
+
+@pytest.mark.parametrize('buffer_type', [bytes, bytearray, memoryview])
+def test_delimited_unpack(buffer_type):
+    """ Test delimited values are decoded without a size field """
+    packet = DelimitedPacket.from_raw(buffer_type(RAW))
+    assert packet.dict() == VALUES
+    assert DelimitedPacket.from_raw(buffer_type(RAW), lazy=True) == packet
+    assert len(DelimitedPacket.unpack_many(buffer_type(RAW * 3))) == 3
+
+def test_delimited_measure():
+    """ Test delimited values are measured from the start of a packet """
+    assert DelimitedPacket.frame_size(RAW) == len(RAW)
+    assert DelimitedPacket.frame_size(RAW[:-3]) is None
+    assert DelimitedPacket.frame_size(RAW[:3]) is None
+    assert DelimitedPacket.frame_size(RAW[:-2]) == len(RAW)
+
+def test_delimited_short():
+    """ Test unpacking values missing part of their data or their terminator """
+    with pytest.raises(struct.error):
+        DelimitedPacket.from_raw(RAW[:100])
+    with pytest.raises(struct.error):
+        DelimitedPacket.from_raw(RAW[:-5])
+
+def test_delimited_passthrough():
+    """ Test resized delimited values repack the packet """
+    packet = DelimitedPacket.from_raw(RAW, retain=True)
+    packet['tag'] = 'longer'
+    assert DelimitedPacket.from_raw(packet.pack())['tag'] == 'longer'
+    packet['message'] = ''
+    assert DelimitedPacket.from_raw(packet.pack())['message'] == ''
+
+def test_delimited_errors():
+    """ Test values that can't be delimited, and invalid delimiters """
+    with pytest.raises(struct.error):
+        DelimitedPacket(tag='a\x00b')
+    with pytest.raises(struct.error):
+        DelimitedPacket(host='x' * 256)
+    with pytest.raises(ValueError):
+        fields.Raw('raw', size=2, prefix=fields.UInt8())
+    with pytest.raises(ValueError):
+        fields.Raw('raw', terminator=b'')
+
+@pytest.mark.parametrize('size', [0, 62, 63, 64, 65, 191, 192, 1000])
+def test_delimited_views(size):
+    """ Test terminators are found in views wherever they fall """
+    field = fields.Raw('line', terminator=b'\r\n')
+    raw = b'\xff' + b'x' * size + b'\r\n' + b'y\r\n'
+    assert field.unpack_from(memoryview(raw), 1) == (b'x' * size, size + 2)
+    assert field.skip(memoryview(raw), size + 3) == 3
+    assert field.skip(memoryview(raw)[:-1], size + 3) is None
+
+@pytest.mark.parametrize('value', [0, 1, 127, 128, 300, 2 ** 64 - 1])
+def test_varint(value):
+    """ Test variable length integers round trip through their size """
+    field = fields.VarInt()
+    raw = field.pack(value)
+    assert len(raw) == field.size(value)
+    assert field.unpack_from(raw) == (value, len(raw))
+    with pytest.raises(struct.error):
+        field.validate(-1)
@@ -176,3 +176,37 @@ def test_packet_list():
     packet4['list'] = subpacket
     assert packet4['count'] == 1
     assert packet4['list']  == [subpacket]
+
+class WaveformPacket(packets.LittleEndian):
+    """ Large dynamically sized list packet (Little Endian) """
+    class Sample(packets.LittleEndian):
+        """ Sample sub-packet (Little Endian) """
+        fields = [
+            fields.UInt16('value'),
+            fields.Padding(default=b'\xee'),
+        ]
+    fields = [
+        fields.UInt16('count'),
+        fields.List('samples', fields.UInt16(), size='count'),
+        fields.List('names', fields.String(size=4), size=2),
+        fields.List('packets', fields.Packet(default=Sample()), size='count'),
+    ]
+
+#@pytest.mark.skip()
+def test_bulk_list():
+    """ Test large lists of fixed size fields and packets """
+    data = list(range(4096))
+    subpackets = [WaveformPacket.Sample(value=x) for x in data]
+    packet1 = WaveformPacket(samples=data, names=['ab', 'cd'], packets=subpackets)
+    assert packet1.size() == 2 + 4096 * 2 + 8 + 4096 * 3
+
+    raw1 = packet1.pack()
+    raw2 = (struct.pack('<H4096H', 4096, *data) + b'ab\x00\x00cd\x00\x00' +
+            b''.join(struct.pack('<Hc', x, b'\xee') for x in data))
+    assert raw1 == raw2
+
+    packet2 = WaveformPacket.from_raw(raw1)
+    assert packet2['samples'] == data
+    assert packet2['names']   == ['ab', 'cd']
+    assert packet2['packets'] == subpackets
+    assert packet2 == packet1
@@ -0,0 +1,48 @@
+""" Testing hex dumps of packets and buffers """
+#pylint: disable=C0326,W0621
+from __future__ import unicode_literals
+import pytest #pylint: disable=unused-import
+from packeteer import packets, fields, hex_dump
+
+# Packet classes
+class Packet(packets.BigEndian):
+    """ Dumped packet (Big Endian) """
+    fields = [
+        fields.UInt32('id'),
+        fields.Padding(),
+        fields.UInt8('size'),
+        fields.Raw('raw', size='size'),
+        fields.UInt16('end'),
+    ]
+
+def reference_dump(raw):
+    """ Dump bytes one at a time """
+    dump = ''
+    for idx, byte in enumerate(bytearray(raw)):
+        if (idx % 16) == 0:
+            dump += "{:04x}".format(idx)
+        elif (idx % 8) == 0:
+            dump += ' '
+        dump += " {:02x}".format(byte)
+        if (idx % 16) == 15 and idx != len(raw)-1:
+            dump += '\n'
+    return dump
+
+### TESTS ###
+@pytest.mark.parametrize('size', [0, 1, 8, 9, 16, 17, 40, 1000])
+def test_hex_dump_buffer(size):
+    """ Test dumping buffers of every length like bytes are dumped one at a time """
+    raw = bytes(bytearray(range(256)) * 4)[:size]
+    assert hex_dump(raw) == reference_dump(raw)
+    assert hex_dump(memoryview(bytearray(raw))) == reference_dump(raw)
+    assert list(packets.iter_hex_dump(raw)) == reference_dump(raw).splitlines()
+
+def test_hex_dump_annotated():
+    """ Test annotating dumps with where the fields start """
+    packet = Packet(id=1, raw=b'x' * 20, end=2)
+    assert packet.hex_dump() == reference_dump(packet.pack())
+
+    lines = packet.hex_dump(annotate=True).splitlines()
+    assert lines[0] == '{:<53}  id, size, raw'.format(reference_dump(packet.pack()).splitlines()[0])
+    assert lines[1].endswith('  end')
+    assert list(packet.iter_hex_dump()) == packet.hex_dump().splitlines()
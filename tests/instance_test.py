@@ -0,0 +1,100 @@
+""" Testing packet instances share their class schema but not their values """
+#pylint: disable=C0326,W0621
+from __future__ import unicode_literals
+import copy
+import pickle
+import pytest #pylint: disable=unused-import
+from packeteer import packets, fields
+
+# Packet classes
+class SubPacket(packets.BigEndian):
+    """ Sub-packet (Big Endian) """
+    fields = [
+        fields.UInt8('value'),
+    ]
+
+class Packet(packets.BigEndian):
+    """ Packet with mutable values (Big Endian) """
+    __slots__ = ()
+    fields = [
+        fields.UInt8('count'),
+        fields.List('list', fields.UInt8(), size='count'),
+        fields.Packet('sub', default=SubPacket(value=7)),
+    ]
+
+### TESTS ###
+def test_shared_fields():
+    """ Test field instances are shared by all packets of a class """
+    packet1 = Packet()
+    packet2 = Packet()
+    assert packet1.fields is Packet.fields
+    assert packet2.fields is Packet.fields
+
+def test_unshared_values():
+    """ Test mutable default values aren't shared between instances """
+    packet1 = Packet()
+    packet2 = Packet()
+    assert packet1['list'] is not packet2['list']
+    assert packet1['sub'] is not packet2['sub']
+    assert packet1['sub'] == packet2['sub']
+
+    packet1['list'] = [1, 2]
+    packet1['sub']['value'] = 42
+    assert packet2['count'] == 0
+    assert packet2['list'] == []
+    assert packet2['sub']['value'] == 7
+
+def test_deepcopy():
+    """ Test copying a packet copies its values """
+    packet1 = Packet(list=[1, 2, 3])
+    packet2 = copy.deepcopy(packet1)
+    assert packet1 == packet2
+    assert packet1['list'] is not packet2['list']
+    assert packet2.pack() == packet1.pack()
+
+class AttributePacket(SubPacket):
+    """ Packet with attributes (Big Endian) """
+    def __init__(self, **kwargs):
+        super(AttributePacket, self).__init__(**kwargs)
+        self.received = True
+
+def test_unslotted_subclass():
+    """ Test packet classes only get slots when they declare them """
+    packet = AttributePacket(value=3)
+    assert packet.received
+    packet.name = 'Renamed'
+    assert packet.name == 'Renamed'
+    assert AttributePacket.name == 'Packet with attributes (Big Endian)'
+    assert AttributePacket.from_raw(b'\x05')['value'] == 5
+    assert AttributePacket.from_raw(b'\x05').received
+    assert AttributePacket.unpack_many(b'\x05\x06')[1].received
+
+@pytest.mark.parametrize('copier', [copy.copy, copy.deepcopy,
+                                    lambda x: pickle.loads(pickle.dumps(x, protocol=2))])
+def test_unslotted_copy(copier):
+    """ Test copies of packets keep their own attributes """
+    packet1 = AttributePacket(value=3)
+    packet1.extra = [1]
+    packet1.name = 'Renamed'
+    packet2 = copier(packet1)
+    assert packet2 == packet1
+    assert packet2.received
+    assert packet2.extra == [1]
+    assert packet2.name == 'Renamed'
+    packet2['value'] = 4
+    assert packet1['value'] == 3
+
+def test_slotted_values():
+    """ Test slotted packet instances only store their values """
+    packet = Packet()
+    assert not hasattr(packet, '__dict__')
+    assert packet.name == 'Packet with mutable values (Big Endian)'
+    with pytest.raises(AttributeError):
+        packet.foo = 'bar'
+
+def test_pickle():
+    """ Test slotted packets can be pickled """
+    packet1 = Packet(list=[4, 5])
+    packet2 = pickle.loads(pickle.dumps(packet1, protocol=2))
+    assert packet1 == packet2
+    assert packet2['sub']['value'] == 7
@@ -0,0 +1,130 @@
+""" Testing reading and writing packets from files """
+#pylint: disable=C0326,W0621
+from __future__ import unicode_literals
+import os
+import socket
+import struct
+import pytest #pylint: disable=unused-import
+from packeteer import packets, fields
+from packeteer.io import MappedReader, PacketWriter
+
+# Packet classes
+class FixedPacket(packets.LittleEndian):
+    """ Fixed layout packet (Little Endian) """
+    fields = [
+        fields.UInt32('id'),
+        fields.UInt16('value'),
+    ]
+
+class DynamicPacket(packets.BigEndian):
+    """ Dynamic layout packet (Big Endian) """
+    fields = [
+        fields.UInt16('id'),
+        fields.UInt8('size'),
+        fields.Raw('raw', size='size'),
+    ]
+
+class WidePacket(packets.BigEndian):
+    """ Dynamic layout packet with a wide size (Big Endian) """
+    fields = [
+        fields.UInt16('id'),
+        fields.UInt16('size'),
+        fields.Raw('raw', size='size'),
+    ]
+
+def write_file(path, records, tail=b''):
+    """ Write packets into a file """
+    with open(path, 'wb') as fileobj:
+        fileobj.write(b''.join(x.pack() for x in records) + tail)
+    return records
+
+### TESTS ###
+def test_mapped_fixed(tmpdir):
+    """ Test fixed size records are found by their index """
+    path = str(tmpdir.join('fixed.bin'))
+    records = write_file(path, [FixedPacket(id=x, value=x * 2) for x in range(100)], b'\x00')
+
+    with MappedReader(path, FixedPacket) as reader:
+        assert len(reader) == 100
+        assert reader[7] == records[7]
+        assert reader[-1] == records[-1]
+        assert reader[10:20] == records[10:20]
+        assert reader[::-7] == records[::-7]
+        assert reader[200:] == []
+        assert list(reader) == records
+        with pytest.raises(IndexError):
+            reader[100] #pylint: disable=pointless-statement
+    assert not os.path.exists(path + '.idx')
+
+def test_mapped_dynamic(tmpdir):
+    """ Test dynamic size records are found by their persisted index """
+    path = str(tmpdir.join('dynamic.bin'))
+    records = write_file(path, [DynamicPacket(id=x, raw=b'x' * (x % 7)) for x in range(50)],
+                         struct.pack('>HB', 0, 10))
+
+    with MappedReader(path, DynamicPacket) as reader:
+        assert len(reader) == 50
+        assert reader[49] == records[49]
+        assert reader.offset(3) == 3 + 4 + 5
+        assert reader[1:5] == records[1:5]
+    assert os.path.exists(path + '.idx')
+
+    # The index is reused as long as the file doesn't change
+    with open(path + '.idx', 'r+b') as fileobj:
+        fileobj.seek(-8, os.SEEK_END)
+        fileobj.write(struct.pack('<Q', 0))
+    with MappedReader(path, DynamicPacket) as reader:
+        assert len(reader) == 50
+        assert reader[49] is not None
+        assert reader.offset(50) == 0
+
+    os.remove(path + '.idx')
+    write_file(path, records[:2])
+    with MappedReader(path, DynamicPacket, persist=False) as reader:
+        assert list(reader) == records[:2]
+    assert not os.path.exists(path + '.idx')
+
+def test_mapped_layout(tmpdir):
+    """ Test persisted indexes are only reused by the packet class that built them """
+    path = str(tmpdir.join('layout.bin'))
+    write_file(path, [DynamicPacket(id=x, raw=b'x') for x in range(5)])
+
+    with MappedReader(path, DynamicPacket) as reader:
+        assert len(reader) == 5
+    with MappedReader(path, WidePacket) as reader:
+        assert len(reader) == 0
+    with MappedReader(path, packets.Union(DynamicPacket, 'id', default=DynamicPacket)) as reader:
+        assert len(reader) == 5
+        assert reader[4]['raw'] == b'x'
+
+def test_mapped_empty(tmpdir):
+    """ Test empty files have no records """
+    path = str(tmpdir.join('empty.bin'))
+    write_file(path, [])
+    with MappedReader(path, DynamicPacket) as reader:
+        assert len(reader) == 0
+        assert list(reader) == []
+
+def test_writer_file(tmpdir):
+    """ Test packets are buffered and written to files """
+    path = str(tmpdir.join('written.bin'))
+    records = [DynamicPacket(id=x, raw=b'x' * x) for x in range(20)]
+    with open(path, 'wb') as fileobj:
+        with PacketWriter(fileobj, buffer_size=16) as writer:
+            writer.write_many(records)
+            writer.write(FixedPacket(id=1, value=2))
+
+    with open(path, 'rb') as fileobj:
+        assert fileobj.read() == b''.join(x.pack() for x in records) + struct.pack('<IH', 1, 2)
+
+def test_writer_socket():
+    """ Test packets are sent over sockets """
+    sender, receiver = socket.socketpair()
+    records = [FixedPacket(id=x) for x in range(10)]
+    with sender, receiver:
+        writer = PacketWriter(sender, buffer_size=30)
+        writer.write_many(records)
+        # Only full buffers are sent until they're flushed
+        assert receiver.recv(100) == b''.join(x.pack() for x in records[:5])
+        writer.flush()
+        assert receiver.recv(100) == b''.join(x.pack() for x in records[5:])
@@ -0,0 +1,79 @@
+""" Testing lazily unpacked packets """
+#pylint: disable=C0326,W0621,protected-access
+from __future__ import unicode_literals
+import struct
+import pytest #pylint: disable=unused-import
+from packeteer import packets, fields
+
+# Packet classes
+class SubPacket(packets.BigEndian):
+    """ Fixed sub-packet (Big Endian) """
+    fields = [
+        fields.UInt16('value'),
+    ]
+
+class Packet(packets.BigEndian):
+    """ Routed packet (Big Endian) """
+    fields = [
+        fields.UInt8('type'),
+        fields.UInt16('size'),
+        fields.String('string', size='size'),
+        fields.UInt8('count'),
+        fields.List('list', fields.UInt32(), size='count'),
+        fields.Packet('sub', default=SubPacket()),
+        fields.Raw('raw', size=4),
+    ]
+
+def gen_packet():
+    """ Generate a packet with values in every field """
+    return Packet(type=7, string='Hello World', list=[1, 2, 3],
+                  sub=SubPacket(value=42), raw=b'abcd')
+
+def pending(packet):
+    """ Fetch the names of the fields not decoded yet """
+    return [name for idx, name in enumerate(packet.keys())
+            if packet._values[packet._fidx[idx]] is packets.PENDING]
+
+### TESTS ###
+def test_lazy_access():
+    """ Test lazy fields are only decoded when accessed """
+    raw = gen_packet().pack()
+    packet = Packet.from_raw(raw, lazy=True)
+    # Only the fields holding sizes are decoded to find the offsets
+    assert pending(packet) == ['type', 'string', 'list', 'sub', 'raw']
+    assert packet.size() == len(raw)
+
+    assert packet['type'] == 7
+    assert pending(packet) == ['string', 'list', 'sub', 'raw']
+    assert packet['list'] == [1, 2, 3]
+    assert pending(packet) == ['string', 'sub', 'raw']
+    assert packet['sub']['value'] == 42
+
+    assert packet.values() == gen_packet().values()
+    assert pending(packet) == []
+    assert packet == gen_packet()
+    assert packet.pack() == raw
+
+def test_lazy_set():
+    """ Test setting values of lazy packets """
+    raw = gen_packet().pack()
+    packet = Packet.from_raw(raw, lazy=True)
+    packet['type'] = 1
+    assert pending(packet) == ['string', 'list', 'sub', 'raw']
+    assert packet['raw'] == b'abcd'
+
+    packet['string'] = 'Hi'
+    assert pending(packet) == []
+    assert packet['list'] == [1, 2, 3]
+    assert packet.pack() == Packet(type=1, string='Hi', list=[1, 2, 3],
+                                   sub=SubPacket(value=42), raw=b'abcd').pack()
+
+def test_lazy_short():
+    """ Test lazily unpacking from short buffers """
+    raw = gen_packet().pack()
+    with pytest.raises(struct.error):
+        Packet.from_raw(raw[:-1], lazy=True)
+
+    packet = Packet.from_raw(raw[:27], partial=True, lazy=True)
+    assert packet['list'] == [1, 2, 3]
+    assert packet['sub']['value'] == 0
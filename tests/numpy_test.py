@@ -0,0 +1,66 @@
+""" Testing numpy structured array support """
+#pylint: disable=C0326,W0621
+from __future__ import unicode_literals
+import struct
+import pytest
+from packeteer import packets, fields
+numpy = pytest.importorskip('numpy')
+
+# Packet classes
+class SensorPacket(packets.BigEndian):
+    """ Sensor record (Big Endian) """
+    fields = [
+        fields.UInt16('id'),
+        fields.Padding(default=b'\xff'),
+        fields.Int32('value'),
+        fields.Double('scale'),
+        fields.Raw('tag', size=3),
+    ]
+
+class DynamicPacket(packets.BigEndian):
+    """ Dynamic layout packet (Big Endian) """
+    fields = [
+        fields.UInt8('size'),
+        fields.Raw('raw', size='size'),
+    ]
+
+RAW = b''.join(struct.pack('>HBid3s', x, 0xff, -x, x / 2.0, b'ab') for x in range(8))
+
+### TESTS ###
+def test_numpy_dtype():
+    """ Test deriving the numpy dtype of a packet """
+    dtype = SensorPacket.numpy_dtype()
+    assert dtype.names == ('id', 'value', 'scale', 'tag')
+    assert dtype.itemsize == SensorPacket().size()
+    assert dtype.fields['value'][1] == 3
+    assert dtype['id'] == numpy.dtype('>u2')
+    with pytest.raises(TypeError):
+        DynamicPacket.numpy_dtype()
+
+def test_decode_array():
+    """ Test decoding a buffer into an array view """
+    buffer = bytearray(RAW)
+    array = SensorPacket.decode_array(buffer)
+    assert len(array) == 8
+    assert list(array['id']) == list(range(8))
+    assert list(array['value']) == [-x for x in range(8)]
+    assert array['tag'][0] == b'ab'
+
+    # Views share the buffer memory
+    buffer[0:2] = b'\x01\x00'
+    assert array['id'][0] == 256
+    assert len(SensorPacket.decode_array(RAW, count=2, offset=RAW.find(b'\x00\x02'))) == 2
+
+def test_encode_array():
+    """ Test encoding arrays back into raw bytes """
+    array = SensorPacket.decode_array(RAW)
+    assert SensorPacket.encode_array(array) == RAW
+
+    plain = numpy.zeros(8, dtype=[('id', 'u2'), ('value', 'i4'), ('scale', 'f8'), ('tag', 'S3')])
+    plain['id'] = numpy.arange(8)
+    plain['value'] = -numpy.arange(8)
+    plain['scale'] = numpy.arange(8) / 2.0
+    plain['tag'] = b'ab'
+    raw = SensorPacket.encode_array(plain)
+    assert raw == RAW
+    assert SensorPacket.unpack_many(raw)[5]['value'] == -5
@@ -0,0 +1,50 @@
+""" Testing packing packets directly into buffers """
+#pylint: disable=C0326,W0621
+from __future__ import unicode_literals
+import struct
+import pytest #pylint: disable=unused-import
+from packeteer import packets, fields
+
+# Packet classes
+class FixedPacket(packets.BigEndian):
+    """ Fixed layout packet (Big Endian) """
+    fields = [
+        fields.UInt16('uint16'),
+        fields.Padding(),
+        fields.String('string', size=4),
+    ]
+
+class DynamicPacket(packets.LittleEndian):
+    """ Dynamic layout packet (Little Endian) """
+    fields = [
+        fields.UInt8('count'),
+        fields.List('list', fields.UInt16(), size='count'),
+        fields.Packet('sub', default=FixedPacket()),
+        fields.Raw('raw', size=3),
+    ]
+
+### TESTS ###
+def test_pack_into_fixed():
+    """ Test packing a fixed layout packet back to back into one buffer """
+    packet = FixedPacket(uint16=0x1234, string='ab')
+    size = packet.size()
+    buffer = bytearray(b'\xff' * (size * 2 + 1))
+
+    written = packet.pack_into(buffer, 1)
+    written += packet.pack_into(buffer, 1 + written)
+
+    assert written == size * 2
+    assert bytes(buffer[1:]) == packet.pack() * 2
+    assert packet.pack() == struct.pack('>Hx4s', 0x1234, b'ab')
+
+def test_pack_into_dynamic():
+    """ Test packing a dynamic layout packet into a memoryview """
+    sub = FixedPacket(uint16=7, string='xyz')
+    packet = DynamicPacket(list=[1, 2], sub=sub, raw=b'r')
+    buffer = bytearray(b'\xff' * packet.size())
+
+    written = packet.pack_into(memoryview(buffer))
+
+    assert written == packet.size()
+    assert bytes(buffer) == packet.pack()
+    assert bytes(buffer) == struct.pack('<BHH', 2, 1, 2) + sub.pack() + b'r\x00\x00'
@@ -0,0 +1,90 @@
+""" Testing decoding records with a pool of worker processes """
+#pylint: disable=C0326,W0621
+from __future__ import unicode_literals
+import pytest #pylint: disable=unused-import
+from packeteer import packets, fields
+from packeteer.io import decode_parallel
+
+pytest.importorskip('concurrent.futures')
+
+# Packet classes
+class FixedPacket(packets.LittleEndian):
+    """ Fixed layout packet (Little Endian) """
+    fields = [
+        fields.UInt32('id'),
+        fields.Int16('value'),
+    ]
+
+class DynamicPacket(packets.BigEndian):
+    """ Dynamic layout packet (Big Endian) """
+    fields = [
+        fields.UInt16('id'),
+        fields.UInt8('size'),
+        fields.String('string', size='size'),
+    ]
+
+class Header(packets.LittleEndian):
+    """ Record header (Little Endian) """
+    fields = [
+        fields.UInt8('kind'),
+    ]
+
+class SmallPacket(packets.LittleEndian):
+    """ Small record (Little Endian) """
+    fields = [
+        fields.UInt8('kind', default=1),
+        fields.UInt16('value'),
+    ]
+
+class LargePacket(packets.LittleEndian):
+    """ Large record (Little Endian) """
+    fields = [
+        fields.UInt8('kind', default=2),
+        fields.UInt8('size'),
+        fields.Raw('raw', size='size'),
+    ]
+
+UNION = packets.Union(Header, 'kind', {1: SmallPacket, 2: LargePacket})
+
+FIXED   = [FixedPacket(id=x, value=-x) for x in range(500)]
+DYNAMIC = [DynamicPacket(id=x, string='s' * (x % 11)) for x in range(300)]
+
+### TESTS ###
+@pytest.mark.parametrize('records', [FIXED, DYNAMIC])
+def test_parallel_file(tmpdir, records):
+    """ Test decoding the records of a file in order """
+    path = str(tmpdir.join('records.bin'))
+    with open(path, 'wb') as fileobj:
+        fileobj.write(b''.join(x.pack() for x in records))
+
+    packet_cls = type(records[0])
+    assert decode_parallel(path, packet_cls, workers=2, chunk_size=256) == records
+    columns = decode_parallel(path, packet_cls, workers=2, columns=True, chunk_size=256)
+    assert columns['id'] == [x['id'] for x in records]
+
+@pytest.mark.parametrize('records', [FIXED, DYNAMIC])
+def test_parallel_buffer(records):
+    """ Test decoding the records of a buffer out of order """
+    raw = b''.join(x.pack() for x in records)
+    packet_cls = type(records[0])
+    decoded = list(decode_parallel(raw, packet_cls, workers=2, ordered=False, chunk_size=100))
+    assert sorted(decoded, key=lambda x: x['id']) == records
+
+    chunks = list(decode_parallel(raw, packet_cls, workers=2, ordered=False, columns=True))
+    assert len(chunks) == 1
+    assert decode_parallel(b'', packet_cls, columns=True) == {name: [] for name in records[0].keys()}
+
+@pytest.mark.parametrize('in_file', [False, True])
+def test_parallel_union(tmpdir, in_file):
+    """ Test decoding records of any class of a union """
+    records = [SmallPacket(value=x) if x % 3 else LargePacket(raw=b'r' * x) for x in range(100)]
+    source = b''.join(x.pack() for x in records)
+    if in_file:
+        path = str(tmpdir.join('union.bin'))
+        with open(path, 'wb') as fileobj:
+            fileobj.write(source)
+        source = path
+
+    assert decode_parallel(source, UNION, workers=2, chunk_size=64) == records
+    with pytest.raises(ValueError):
+        decode_parallel(source, UNION, columns=True)
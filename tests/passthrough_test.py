@@ -0,0 +1,122 @@
+""" Testing unpacked packets reuse their bytes when packed again """
+#pylint: disable=C0326,W0621
+from __future__ import unicode_literals
+import struct
+import pytest #pylint: disable=unused-import
+from packeteer import packets, fields
+
+# Packet classes
+class FixedPacket(packets.BigEndian):
+    """ Fixed layout packet (Big Endian) """
+    fields = [
+        fields.UInt16('seq'),
+        fields.Padding(),
+        fields.String('name', size=4),
+    ]
+
+class DynamicPacket(packets.BigEndian):
+    """ Dynamic layout packet (Big Endian) """
+    fields = [
+        fields.UInt32('seq'),
+        fields.UInt8('size'),
+        fields.Raw('raw', size='size'),
+        fields.Packet('sub', default=FixedPacket()),
+        fields.UInt8('count'),
+        fields.List('list', fields.UInt8(), size='count'),
+    ]
+
+class MessagePacket(packets.BigEndian):
+    """ Message with a header sub-packet (Big Endian) """
+    fields = [
+        fields.Packet('header', default=FixedPacket()),
+        fields.UInt8('size'),
+        fields.Raw('body', size='size'),
+    ]
+
+FIXED_RAW   = struct.pack('>Hx4s', 1, b'abcd')
+DYNAMIC_RAW = struct.pack('>IB3s', 7, 3, b'xyz') + FIXED_RAW + struct.pack('>BBB', 2, 4, 5)
+
+### TESTS ###
+def test_passthrough_unmodified():
+    """ Test unmodified packets return the bytes they were unpacked from """
+    fixed = FixedPacket.from_raw(FIXED_RAW, retain=True)
+    dynamic = DynamicPacket.from_raw(DYNAMIC_RAW, retain=True)
+    assert not fixed.modified()
+    assert fixed.pack() is FIXED_RAW
+    assert dynamic.pack() == DYNAMIC_RAW
+
+    packet = DynamicPacket()
+    assert packet.unpack_from(b'\xff' + DYNAMIC_RAW + b'\xff', 1, retain=True) == len(DYNAMIC_RAW)
+    assert packet.pack() == DYNAMIC_RAW
+    assert FixedPacket().modified()
+
+def test_passthrough_modified():
+    """ Test only the modified fields are re-encoded """
+    fixed = FixedPacket.from_raw(FIXED_RAW, retain=True)
+    fixed['seq'] = 2
+    assert fixed.modified()
+    assert fixed.pack() == struct.pack('>Hx4s', 2, b'abcd')
+
+    dynamic = DynamicPacket.from_raw(DYNAMIC_RAW, retain=True)
+    dynamic['seq'] = 8
+    dynamic['sub']['name'] = 'dcba'
+    dynamic['list'][1] = 6
+    expected = struct.pack('>IB3s', 8, 3, b'xyz') + struct.pack('>Hx4s', 1, b'dcba') + b'\x02\x04\x06'
+    assert dynamic.pack() == expected
+
+    buffer = bytearray(len(expected) + 1)
+    assert dynamic.pack_into(buffer, 1) == len(expected)
+    assert bytes(buffer[1:]) == expected
+
+def test_passthrough_resized():
+    """ Test fields changing size have the packet packed from scratch """
+    dynamic = DynamicPacket.from_raw(DYNAMIC_RAW, lazy=True, retain=True)
+    dynamic['raw'] = b'ab'
+    assert dynamic['size'] == 2
+    assert dynamic.pack() == struct.pack('>IB2s', 7, 2, b'ab') + DYNAMIC_RAW[8:]
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_passthrough_referenced(lazy):
+    """ Test setting a size field repacks the field it sizes """
+    raw = struct.pack('>IB3s', 7, 3, b'xyz') + DYNAMIC_RAW[8:]
+    dynamic = DynamicPacket.from_raw(raw, lazy=lazy, retain=True)
+    dynamic['size'] = 1
+    assert dynamic.pack() == struct.pack('>IB1s', 7, 1, b'x') + DYNAMIC_RAW[8:]
+    assert len(dynamic.pack()) == dynamic.size()
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_passthrough_sub_packets(lazy):
+    """ Test sub-packets retain their bytes along with their packet """
+    raw = FIXED_RAW + b'\x02hi'
+    message = MessagePacket.from_raw(raw, lazy=lazy, retain=True)
+    assert not message['header'].modified()
+    assert not message.modified()
+    assert message.pack() is raw
+
+    message['header']['seq'] = 2
+    assert message._patches() == [0] #pylint: disable=protected-access
+    assert message.pack() == struct.pack('>Hx4s', 2, b'abcd') + b'\x02hi'
+
+def test_passthrough_unpack():
+    """ Test packets unpacked in place can retain their bytes """
+    raw = FIXED_RAW + b'\x02hi'
+    packet = MessagePacket()
+    packet.unpack(raw, retain=True)
+    assert packet.pack() is raw
+
+def test_passthrough_unretained():
+    """ Test packets only hold on to their bytes when asked to """
+    packet = DynamicPacket.from_raw(DYNAMIC_RAW)
+    assert packet.modified()
+    assert packet.pack() == DYNAMIC_RAW
+    assert packet.pack() is not DYNAMIC_RAW
+    assert FixedPacket.from_raw(FIXED_RAW).pack() is not FIXED_RAW
+
+def test_passthrough_mutable_buffers():
+    """ Test packets unpacked from mutable buffers don't hold on to them """
+    buffer = bytearray(FIXED_RAW)
+    packet = FixedPacket.from_raw(buffer, retain=True)
+    buffer[0:2] = b'\xff\xff'
+    assert packet['seq'] == 1
+    assert packet.pack() == FIXED_RAW
+    assert packet.modified()
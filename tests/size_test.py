@@ -0,0 +1,64 @@
+""" Testing cached packet sizes and static offsets """
+#pylint: disable=C0326,W0621,protected-access
+from __future__ import unicode_literals
+import pytest #pylint: disable=unused-import
+from packeteer import packets, fields
+
+# Packet classes
+class SubPacket(packets.BigEndian):
+    """ Dynamic sub-packet (Big Endian) """
+    fields = [
+        fields.UInt8('size'),
+        fields.Raw('raw', size='size'),
+    ]
+
+class FixedSubPacket(packets.BigEndian):
+    """ Fixed sub-packet (Big Endian) """
+    fields = [
+        fields.UInt16('value'),
+    ]
+
+class Packet(packets.BigEndian):
+    """ Mixed layout packet (Big Endian) """
+    fields = [
+        fields.UInt8('type'),
+        fields.Packet('fixed', default=FixedSubPacket()),
+        fields.UInt16('count'),
+        fields.List('list', fields.UInt32(), size='count'),
+        fields.String('string', size=4),
+        fields.Packet('sub', default=SubPacket()),
+    ]
+
+### TESTS ###
+def test_static_layout():
+    """ Test static sizes and offsets are computed with the class """
+    assert FixedSubPacket._static_size == 2
+    assert SubPacket._static_size is None
+    assert Packet._static_size is None
+    assert Packet._fixed_size == 1 + 2 + 2 + 4
+    assert Packet._offsets == [0, 1, 3, 5]
+    assert Packet._sizers == {2, 3}
+
+def test_cached_size():
+    """ Test cached sizes are invalidated when their size changes """
+    packet = Packet()
+    assert packet.size() == 10
+    packet['type'] = 1
+    assert packet.size() == 10
+
+    packet['list'] = [1, 2, 3]
+    assert packet.size() == 10 + 12
+    packet['count'] = 1
+    assert packet.size() == 10 + 4
+    assert packet.size() == len(packet.pack())
+
+    packet.unpack(Packet(list=[1, 2]).pack())
+    assert packet.size() == 10 + 8
+
+def test_volatile_size():
+    """ Test nested packets modified in place are always resized """
+    packet = Packet()
+    assert packet.size() == 10
+    packet['sub']['raw'] = b'Hello'
+    assert packet.size() == 10 + 5
+    assert packet.size() == len(packet.pack())
@@ -0,0 +1,63 @@
+""" Testing the statistics of packet operations """
+#pylint: disable=C0326,W0621
+from __future__ import unicode_literals
+import pytest #pylint: disable=unused-import
+import packeteer
+from packeteer import packets, fields
+
+# Packet classes
+class SubPacket(packets.BigEndian):
+    """ Sub-packet (Big Endian) """
+    fields = [
+        fields.UInt8('size'),
+        fields.Raw('raw', size='size'),
+    ]
+
+class Packet(packets.BigEndian):
+    """ Counted packet (Big Endian) """
+    fields = [
+        fields.UInt16('id'),
+        fields.Packet('sub', default=SubPacket()),
+    ]
+
+NAME = '{}.Packet'.format(__name__)
+SUB_NAME = '{}.SubPacket'.format(__name__)
+
+@pytest.fixture
+def recorded():
+    """ Record statistics for the duration of a test """
+    calls = []
+    packeteer.reset_stats()
+    packeteer.enable_stats(lambda *args: calls.append(args))
+    yield calls
+    packeteer.disable_stats()
+    packeteer.reset_stats()
+
+### TESTS ###
+def test_stats_disabled():
+    """ Test nothing is recorded, nor wrapped, while disabled """
+    packet = Packet(sub=SubPacket(raw=b'abc'))
+    Packet.from_raw(packet.pack())
+    assert packeteer.stats() == {}
+    assert packets.BasePacket.pack.__name__ == 'pack'
+
+def test_stats_enabled(recorded):
+    """ Test constructions, packs and unpacks are counted per class """
+    packet = Packet(id=1, sub=SubPacket(raw=b'abc'))
+    raw = packet.pack()
+    packet.pack_into(bytearray(len(raw)))
+    Packet.from_raw(raw)
+
+    snapshot = packeteer.stats()
+    assert snapshot[NAME]['construct']['count'] == 1
+    assert snapshot[NAME]['pack']['count'] == 2
+    assert snapshot[NAME]['pack']['bytes'] == len(raw) * 2
+    assert snapshot[NAME]['unpack'] == {'count': 1, 'bytes': len(raw),
+                                        'seconds': snapshot[NAME]['unpack']['seconds']}
+    assert snapshot[SUB_NAME]['pack']['count'] == 2
+    assert snapshot[SUB_NAME]['unpack']['bytes'] == 4
+    assert (Packet, 'unpack', len(raw)) in [call[:3] for call in recorded]
+
+    packeteer.disable_stats()
+    packet.pack()
+    assert packeteer.stats() == snapshot
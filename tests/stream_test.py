@@ -0,0 +1,87 @@
+""" Testing reassembling packets from byte streams """
+#pylint: disable=C0326,W0621
+from __future__ import unicode_literals
+import struct
+import pytest #pylint: disable=unused-import
+from packeteer import packets, fields
+from packeteer.stream import Framer
+
+# Packet classes
+class SubPacket(packets.BigEndian):
+    """ Sub-packet (Big Endian) """
+    fields = [
+        fields.UInt8('size'),
+        fields.String('string', size='size'),
+    ]
+
+class Packet(packets.BigEndian):
+    """ Framed packet (Big Endian) """
+    fields = [
+        fields.UInt8('type'),
+        fields.UInt16('count'),
+        fields.List('list', fields.UInt16(), size='count'),
+        fields.Packet('sub', default=SubPacket()),
+        fields.UInt8('end'),
+    ]
+
+class ItemsPacket(packets.BigEndian):
+    """ Counted list of dynamic sub-packets (Big Endian) """
+    fields = [
+        fields.UInt8('count'),
+        fields.List('items', fields.Packet(default=SubPacket()), size='count'),
+        fields.List('names', fields.String(prefix=fields.UInt8()), size='count'),
+    ]
+
+def gen_packets():
+    """ Generate packets of different sizes """
+    return [Packet(type=x, list=list(range(x)), sub=SubPacket(string='x' * x), end=0xff)
+            for x in range(5)]
+
+### TESTS ###
+def test_frame_size():
+    """ Test the size of a packet is known once its size fields are """
+    raw = gen_packets()[3].pack()
+    sizes = [Packet.frame_size(raw[:end]) for end in range(len(raw) + 1)]
+    assert sizes[:3] == [None] * 3
+    assert sizes[-1] == len(raw)
+    # Only the sub-packet size is missing after the list
+    assert sizes[3 + 6] is None
+    assert set(sizes[3 + 6 + 1:]) == {len(raw)}
+    assert Packet.frame_size(b'\xff' + raw, 1) == len(raw)
+
+def test_frame_size_volatile():
+    """ Test lists of dynamic values are measured from their count """
+    packet = ItemsPacket(items=[SubPacket(string='abc'), SubPacket(string='de')], names=['x', 'yz'])
+    raw = packet.pack()
+    assert len(raw) == 13
+    assert ItemsPacket.measure(raw) == (13, True)
+    assert ItemsPacket.frame_size(raw[:5]) is None
+
+    framer = Framer(ItemsPacket)
+    assert list(framer.feed(raw[:7])) == []
+    assert list(framer.feed(raw[7:] + raw)) == [packet, packet]
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 7, 1000])
+def test_framer_chunks(chunk_size):
+    """ Test packets are reassembled from arbitrary chunks """
+    expected = gen_packets()
+    raw = b''.join(x.pack() for x in expected)
+    framer = Framer(Packet)
+
+    framed = []
+    for idx in range(0, len(raw), chunk_size):
+        framed.extend(framer.feed(raw[idx:idx + chunk_size]))
+    assert framed == expected
+    assert len(framer) == 0
+
+def test_framer_remainder():
+    """ Test incomplete packets are kept until the rest of them arrives """
+    raw = struct.pack('>BH', 1, 2)
+    framer = Framer(Packet)
+    assert list(framer.feed(raw + b'\x00')) == []
+    assert len(framer) == 4
+
+    packet = Packet(type=1, list=[7, 8], end=9)
+    packets_ = list(framer.feed(packet.pack()[4:] + raw))
+    assert packets_ == [packet]
+    assert len(framer) == 3
@@ -0,0 +1,84 @@
+""" Testing decoding packets into the class selected by a discriminator """
+#pylint: disable=C0326,W0621
+from __future__ import unicode_literals
+import struct
+import pytest #pylint: disable=unused-import
+from packeteer import packets, fields
+from packeteer.stream import Framer
+
+# Packet classes
+class Header(packets.BigEndian):
+    """ Common header (Big Endian) """
+    fields = [
+        fields.UInt16('length'),
+        fields.UInt8('type'),
+    ]
+
+class Ping(packets.BigEndian):
+    """ Ping packet (Big Endian) """
+    fields = [
+        fields.UInt16('length', default=7),
+        fields.UInt8('type', default=1),
+        fields.UInt32('stamp'),
+    ]
+
+class Message(packets.BigEndian):
+    """ Message packet (Big Endian) """
+    fields = [
+        fields.UInt16('length'),
+        fields.UInt8('type', default=2),
+        fields.String('text', size='length'),
+    ]
+
+UNION = packets.Union(Header, 'type', {1: Ping})
+
+@UNION.register(2)
+class Registered(Message):
+    """ Registered message packet (Big Endian) """
+
+### TESTS ###
+def test_union_dispatch():
+    """ Test packets are decoded into the class of their discriminator """
+    ping = Ping(stamp=42)
+    message = Registered(text='Hello')
+    assert UNION.discriminator(message.pack()) == 2
+    assert UNION.from_raw(ping.pack()) == ping
+    assert isinstance(UNION.from_raw(message.pack()), Registered)
+
+    packet, size = UNION.unpack_from(b'\x00' + message.pack(), 1)
+    assert packet == message
+    assert size == 8
+
+    with pytest.raises(ValueError):
+        UNION.from_raw(struct.pack('>HB', 0, 3))
+    assert packets.Union(Header, 'type', default=Header).from_raw(b'\x00\x00\x03')['type'] == 3
+
+def test_union_measure():
+    """ Test packets are measured by the class of their discriminator """
+    raw = Registered(text='Hello').pack()
+    assert UNION.measure(raw[:2]) == (3, False)
+    assert UNION.frame_size(raw[:3]) == 8
+    assert UNION.frame_size(Ping().pack()[:3]) == 7
+
+def test_union_framer():
+    """ Test unions of packets can be reassembled from a stream """
+    expected = [Ping(stamp=1), Registered(text='abc'), Ping(stamp=2)]
+    raw = b''.join(x.pack() for x in expected)
+    framer = Framer(UNION)
+    framed = []
+    for byte in range(len(raw)):
+        framed.extend(framer.feed(raw[byte:byte + 1]))
+    assert framed == expected
+
+def test_union_bad_discriminator():
+    """ Test discriminators must be immutable values at a fixed offset """
+    with pytest.raises(ValueError):
+        packets.Union(Message, 'text')
+
+    class FlagsHeader(packets.BigEndian):
+        """ Header of bit fields (Big Endian) """
+        fields = [
+            fields.BitStruct('flags', [fields.Bits('kind', 4), fields.Bits('version', 4)]),
+        ]
+    with pytest.raises(ValueError):
+        packets.Union(FlagsHeader, 'flags')
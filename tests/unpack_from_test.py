@@ -0,0 +1,52 @@
+""" Testing unpacking packets from buffers at an offset """
+#pylint: disable=C0326,W0621
+from __future__ import unicode_literals
+import mmap
+import struct
+import pytest #pylint: disable=unused-import
+from packeteer import packets, fields
+
+# Packet classes
+class DynamicPacket(packets.LittleEndian):
+    """ Dynamic layout packet (Little Endian) """
+    fields = [
+        fields.UInt16('count'),
+        fields.List('list', fields.UInt16(), size='count'),
+        fields.UInt8('size'),
+        fields.Raw('raw', size='size'),
+    ]
+
+RAW = struct.pack('<HHHHB5s', 3, 1, 2, 3, 5, b'Hello')
+
+### TESTS ###
+@pytest.mark.parametrize('buffer_type', [bytes, bytearray, memoryview])
+def test_unpack_from_buffers(buffer_type):
+    """ Test unpacking from the different buffer types at an offset """
+    buffer = buffer_type(b'\xff\xff' + RAW + b'\xff')
+    packet = DynamicPacket()
+    consumed = packet.unpack_from(buffer, 2)
+
+    assert consumed         == len(RAW)
+    assert packet['count']  == 3
+    assert packet['list']   == [1, 2, 3]
+    assert packet['raw']    == b'Hello'
+    assert packet.pack()    == RAW
+
+def test_unpack_from_mmap():
+    """ Test unpacking directly out of a memory map """
+    buffer = mmap.mmap(-1, len(RAW) * 2)
+    buffer.write(RAW * 2)
+
+    packet1 = DynamicPacket()
+    consumed = packet1.unpack_from(buffer)
+    packet2 = DynamicPacket()
+    packet2.unpack_from(buffer, consumed)
+    buffer.close()
+
+    assert packet1 == packet2
+    assert packet2['raw'] == b'Hello'
+
+def test_unpack_from_short():
+    """ Test unpacking from a buffer that falls short of the packet """
+    with pytest.raises(struct.error):
+        DynamicPacket().unpack_from(RAW[:-1])
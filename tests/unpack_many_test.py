@@ -0,0 +1,73 @@
+""" Testing batch decoding of consecutive packets """
+#pylint: disable=C0326,W0621
+from __future__ import unicode_literals
+import struct
+import pytest #pylint: disable=unused-import
+from packeteer import packets, fields
+
+# Packet classes
+class FixedPacket(packets.LittleEndian):
+    """ Fixed layout packet (Little Endian) """
+    fields = [
+        fields.UInt16('id'),
+        fields.Padding(),
+        fields.String('name', size=4),
+    ]
+
+class DynamicPacket(packets.BigEndian):
+    """ Dynamic layout packet (Big Endian) """
+    fields = [
+        fields.UInt8('size'),
+        fields.Raw('raw', size='size'),
+    ]
+
+FIXED_RAW   = b''.join(struct.pack('<Hx4s', x, b'n' + str(x).encode()) for x in range(10))
+DYNAMIC_RAW = b''.join(struct.pack('>B', x) + b'x' * x for x in range(5))
+
+### TESTS ###
+def test_unpack_many_fixed():
+    """ Test decoding a buffer of fixed layout packets """
+    packets_ = FixedPacket.unpack_many(bytearray(FIXED_RAW) + b'\x00')
+    assert len(packets_) == 10
+    assert packets_[3]['id'] == 3
+    assert packets_[3]['name'] == 'n3'
+    assert b''.join(x.pack() for x in packets_) == FIXED_RAW
+
+    assert FixedPacket.unpack_many(FIXED_RAW, count=2) == packets_[:2]
+    with pytest.raises(struct.error):
+        FixedPacket.unpack_many(FIXED_RAW, count=11)
+
+def test_unpack_many_fixed_columns():
+    """ Test decoding a buffer of fixed layout packets into columns """
+    columns = FixedPacket.unpack_many(memoryview(FIXED_RAW), columns=True)
+    assert columns['id'] == list(range(10))
+    assert columns['name'][9] == 'n9'
+    assert FixedPacket.unpack_many(b'', columns=True) == {'id': [], 'name': []}
+
+class EmptyPacket(packets.BigEndian):
+    """ Packet without fields (Big Endian) """
+    fields = []
+
+def test_unpack_many_truncated():
+    """ Test incomplete trailing packets are left out the same way by every layout """
+    assert len(FixedPacket.unpack_many(FIXED_RAW[:-1])) == 9
+    assert len(DynamicPacket.unpack_many(DYNAMIC_RAW[:-1])) == 4
+    assert len(DynamicPacket.unpack_many(DYNAMIC_RAW + b'\x03x')) == 5
+    with pytest.raises(struct.error):
+        DynamicPacket.unpack_many(DYNAMIC_RAW[:-1], count=5)
+
+def test_unpack_many_empty():
+    """ Test packets without a size only decode once """
+    assert len(EmptyPacket.unpack_many(b'abc')) == 1
+    assert EmptyPacket.unpack_many(b'') == []
+    assert len(EmptyPacket.unpack_many(b'', count=3)) == 3
+    assert DynamicPacket.unpack_many(b'abc', count=0) == []
+
+def test_unpack_many_dynamic():
+    """ Test decoding a buffer of dynamic layout packets """
+    packets_ = DynamicPacket.unpack_many(DYNAMIC_RAW)
+    assert [x['raw'] for x in packets_] == [b'x' * x for x in range(5)]
+    assert DynamicPacket.unpack_many(DYNAMIC_RAW, count=3) == packets_[:3]
+
+    columns = DynamicPacket.unpack_many(DYNAMIC_RAW, columns=True)
+    assert columns['size'] == list(range(5))
@@ -0,0 +1,67 @@
+""" Testing field values are validated when they're set """
+#pylint: disable=C0326,W0621
+from __future__ import unicode_literals
+import struct
+import pytest #pylint: disable=unused-import
+from packeteer import packets, fields
+
+# Packet classes
+class Packet(packets.BigEndian):
+    """ Validated packet (Big Endian) """
+    fields = [
+        fields.Int8('int8'),
+        fields.UInt16('uint16'),
+        fields.Float('float'),
+        fields.Bool('bool'),
+        fields.Char('char'),
+        fields.String('string', size=4, encoding='ascii'),
+        fields.List('list', fields.UInt8(), size=2),
+    ]
+
+### TESTS ###
+@pytest.mark.parametrize('field, good, bad', [
+    (fields.Int8(),   [-128, 127, True],          [-129, 128, 1.5, '1']),
+    (fields.UInt16(), [0, 65535],                 [-1, 65536, None]),
+    (fields.UInt64(), [2 ** 64 - 1],              [2 ** 64]),
+    (fields.Float(),  [0, -1.5, float('inf')],    [1e39, 'x']),
+    (fields.Double(), [1e300, float('nan')],      [10 ** 400, None]),
+    (fields.Char(),   [b'a'],                     [b'ab', 1]),
+])
+def test_validate_numbers(field, good, bad):
+    """ Test the precomputed ranges accept exactly what struct does """
+    for value in good:
+        field.validate(value)
+        struct.pack('>' + field.type, value)
+    for value in bad:
+        with pytest.raises((struct.error, OverflowError, TypeError)):
+            struct.pack('>' + field.type, value)
+        with pytest.raises((struct.error, OverflowError, TypeError)):
+            field.validate(value)
+
+def test_validate_set():
+    """ Test invalid values are refused when they're set """
+    packet = Packet(int8=-1, string='abc', list=[1, 2])
+    for name, value in [('int8', 200), ('string', 'café'), ('list', [1, 256])]:
+        with pytest.raises(TypeError):
+            packet[name] = value
+    with pytest.raises(struct.error):
+        Packet(uint16=-1)
+    assert packet['int8'] == -1
+    assert packet['list'] == [1, 2]
+
+def test_validate_disabled():
+    """ Test trusted values can skip validation, while still being sized """
+    packet = Packet(_validate=False, uint16=-1, list=[1, 2, 3])
+    assert packet['uint16'] == -1
+    assert packet['list'] == [1, 2]
+    with pytest.raises(struct.error):
+        packet.pack()
+
+def test_validate_field_name():
+    """ Test a field can be named validate """
+    class NamedPacket(packets.BigEndian):
+        """ Named packet (Big Endian) """
+        fields = [fields.UInt8('validate')]
+    assert NamedPacket(validate=3)['validate'] == 3
+    with pytest.raises(struct.error):
+        NamedPacket(validate=256)